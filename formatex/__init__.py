@@ -1,29 +1,43 @@
 """FormaTex Python SDK — compile LaTeX to PDF."""
 
-from formatex.client import (
-    FormaTexClient,
-    AsyncJob,
-    CompileResult,
-    ConvertResult,
-    JobResult,
-    LintDiagnostic,
-    LintResult,
-    SyntaxResult,
-    UsageStats,
-    file_entry,
-)
-from formatex.exceptions import (
-    FormaTexError,
-    AuthenticationError,
-    CompilationError,
-    RateLimitError,
-    PlanLimitError,
-)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from formatex._batch import SyntaxCheckBatcher
+    from formatex._cache import ResponseCache
+    from formatex.async_client import AsyncFormaTexClient
+    from formatex.client import (
+        FormaTexClient,
+        AsyncJob,
+        CompileResult,
+        ConvertResult,
+        JobResult,
+        LintDiagnostic,
+        LintResult,
+        SyntaxResult,
+        UsageStats,
+        file_entry,
+        file_entry_raw,
+    )
+    from formatex.exceptions import (
+        FormaTexError,
+        AuthenticationError,
+        CompilationError,
+        RateLimitError,
+        PlanLimitError,
+    )
 
 __all__ = [
     # Client
     "FormaTexClient",
+    "AsyncFormaTexClient",
     "file_entry",
+    "file_entry_raw",
+    "ResponseCache",
+    "SyntaxCheckBatcher",
     # Result types
     "AsyncJob",
     "CompileResult",
@@ -40,3 +54,48 @@ __all__ = [
     "RateLimitError",
     "PlanLimitError",
 ]
+
+# Public name → defining module. Submodules (and httpx) are only imported
+# when one of their names is first accessed, keeping `import formatex` cheap.
+_LAZY = {
+    "FormaTexClient": "formatex.client",
+    "AsyncFormaTexClient": "formatex.async_client",
+    "file_entry": "formatex.client",
+    "file_entry_raw": "formatex.client",
+    "ResponseCache": "formatex._cache",
+    "SyntaxCheckBatcher": "formatex._batch",
+    "AsyncJob": "formatex.client",
+    "CompileResult": "formatex.client",
+    "ConvertResult": "formatex.client",
+    "JobResult": "formatex.client",
+    "LintDiagnostic": "formatex.client",
+    "LintResult": "formatex.client",
+    "SyntaxResult": "formatex.client",
+    "UsageStats": "formatex.client",
+    "FormaTexError": "formatex.exceptions",
+    "FormatExError": "formatex.exceptions",
+    "AuthenticationError": "formatex.exceptions",
+    "CompilationError": "formatex.exceptions",
+    "RateLimitError": "formatex.exceptions",
+    "PlanLimitError": "formatex.exceptions",
+}
+
+# Alternate "FormatEx" spellings used in older docs.
+_ALIASES = {
+    "FormatExClient": "FormaTexClient",
+    "AsyncFormatExClient": "AsyncFormaTexClient",
+}
+
+
+def __getattr__(name: str) -> Any:
+    target = _ALIASES.get(name, name)
+    module = _LAZY.get(target)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), target)
+    globals()[name] = value  # resolve once; later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
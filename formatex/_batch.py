@@ -0,0 +1,84 @@
+"""Client-side coalescing of syntax checks into batch requests."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any
+
+from formatex.exceptions import FormaTexError
+
+if TYPE_CHECKING:
+    from formatex.client import FormaTexClient, SyntaxResult
+
+
+class SyntaxCheckBatcher:
+    """Collects :meth:`check_syntax` calls and sends them as one batch request.
+
+    Calls made within ``window`` seconds of the first pending one (from any
+    thread) are flushed together through
+    :meth:`FormaTexClient.check_syntax_batch`, so N checks cost one round
+    trip instead of N. A batch is also flushed as soon as it reaches
+    ``max_batch`` documents.
+
+    Example::
+
+        with SyntaxCheckBatcher(client) as batcher:
+            futures = [batcher.submit(src) for src in sources]
+        results = [f.result() for f in futures]
+    """
+
+    def __init__(self, client: FormaTexClient, *, window: float = 0.05, max_batch: int = 100):
+        self._client = client
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: list[tuple[str, Future]] = []
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, latex: str) -> Future:
+        """Queue a document; the returned future resolves to a :class:`SyntaxResult`."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((latex, future))
+            full = len(self._pending) >= self.max_batch
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return future
+
+    def check_syntax(self, latex: str) -> SyntaxResult:
+        """Blocking form of :meth:`submit`."""
+        return self.submit(latex).result()
+
+    def flush(self) -> None:
+        """Send all pending documents now."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return
+
+        try:
+            results = self._client.check_syntax_batch([latex for latex, _ in batch])
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as exc:
+            error = exc
+        else:
+            error = FormaTexError(f"no result for {len(batch) - len(results)} of {len(batch)} documents")
+        # Never leave a caller blocked on a future nobody will resolve.
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def __enter__(self) -> "SyntaxCheckBatcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.flush()
@@ -0,0 +1,77 @@
+"""In-memory response cache for idempotent FormaTex API calls."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Union
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    Used by the clients to memoize ``check_syntax``, ``list_engines`` and
+    ``get_usage``. Pass an instance as ``cache=`` to size it or share it
+    between clients; pass ``cache=True`` to get one with the defaults.
+    Clients prefix their keys with :func:`account_key`, so clients using
+    different API keys never see each other's entries. Values are copied
+    on the way in and out, so mutating a returned object cannot change
+    what later callers get.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or ``None`` if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if time.monotonic() >= expires:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+CacheOption = Union[bool, ResponseCache, None]
+
+
+def make_cache(cache: CacheOption) -> ResponseCache | None:
+    """Resolve the clients' ``cache=`` argument."""
+    if isinstance(cache, ResponseCache):
+        return cache
+    return ResponseCache() if cache else None
+
+
+def source_key(endpoint: str, latex: str) -> tuple[str, bytes]:
+    """Cache key for a LaTeX-source request: endpoint plus a BLAKE2b digest."""
+    return endpoint, hashlib.blake2b(latex.encode(), digest_size=16).digest()
+
+
+def account_key(api_key: str) -> bytes:
+    """Per-account cache namespace: a BLAKE2b digest, so the key itself is never stored."""
+    return hashlib.blake2b(api_key.encode(), digest_size=16).digest()
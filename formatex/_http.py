@@ -2,6 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+import binascii
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
 import httpx
 
 from formatex.exceptions import (
@@ -12,83 +25,511 @@ from formatex.exceptions import (
     PlanLimitError,
 )
 
+try:
+    import h2  # noqa: F401  (optional: pip install "formatex[http2]")
+except ImportError:
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+try:
+    import orjson  # optional: pip install "formatex[fast]"
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize a request body to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> Any:
+    """Parse a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Binary endpoints prefer the raw PDF but accept the JSON (base64) form, which
+# is what servers without binary support return anyway.
+PDF_ACCEPT = "application/pdf, application/json;q=0.1"
+
+
+def _partial_path(dest: Path) -> Path:
+    """Hidden sibling of ``dest`` that a download is streamed into before
+    being renamed over it (same directory, so ``os.replace`` is atomic)."""
+    return dest.with_name(f".{dest.name}.{secrets.token_hex(4)}.part")
+
+# Keep connections warm between calls so bursts of requests reuse TCP+TLS.
+DEFAULT_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=100,
+    keepalive_expiry=30,
+)
+
+# 429s asking for a longer pause than this (e.g. an exhausted monthly quota)
+# are raised to the caller instead of being slept through.
+MAX_RETRY_AFTER = 60.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second.
+
+    :meth:`reserve` takes a token and returns how long the caller must wait
+    before using it, so the same bucket serves sync and async transports.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+# -- error mapping -------------------------------------------------------------
+
+
+def _auth_error(msg: str, body: dict, resp: httpx.Response) -> FormaTexError:
+    return AuthenticationError(msg, status_code=401, body=body)
+
+
+def _plan_error(msg: str, body: dict, resp: httpx.Response) -> FormaTexError:
+    return PlanLimitError(msg, status_code=403, body=body)
+
+
+def _compilation_error(msg: str, body: dict, resp: httpx.Response) -> FormaTexError:
+    return CompilationError(msg, log=body.get("log", ""), status_code=422, body=body)
+
+
+def _parse_retry_after(value: str | None) -> float:
+    """Seconds from a ``Retry-After`` header in either delay-seconds or HTTP-date form.
+
+    Returns 0 (meaning "use the computed backoff") when the header is
+    missing or unparseable.
+    """
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)  # "-0000": RFC 5322 for UTC
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _rate_limit_error(msg: str, body: dict, resp: httpx.Response) -> FormaTexError:
+    retry = _parse_retry_after(resp.headers.get("Retry-After"))
+    return RateLimitError(msg, retry_after=retry, status_code=429, body=body)
+
+
+# Status code → exception factory; anything else becomes a plain FormaTexError.
+_ERROR_BUILDERS = {
+    401: _auth_error,
+    403: _plan_error,
+    422: _compilation_error,
+    429: _rate_limit_error,
+}
+
+
+class _BaseHTTPClient:
+    """Connection settings, throttling, response decoding and error mapping
+    shared by the sync and async transports."""
+
+    def _init_throttle(self, max_retries: int, rate_limit: float | None) -> None:
+        self.max_retries = max_retries
+        self._bucket = TokenBucket(rate_limit) if rate_limit else None
+        # path → (ETag, decoded body) for conditional GETs
+        self._etags: dict[str, tuple[str, Any]] = {}
+
+    def _retry_delay(self, exc: RateLimitError, attempt: int) -> float | None:
+        """Seconds to wait before retrying a 429, or ``None`` to give up."""
+        if attempt >= self.max_retries or exc.retry_after > MAX_RETRY_AFTER:
+            return None
+        delay = exc.retry_after or min(2.0 ** attempt, MAX_RETRY_AFTER)
+        return delay + random.uniform(0, 0.1 * delay)
+
+    @staticmethod
+    def _client_kwargs(
+        api_key: str, base_url: str, timeout: float, limits: httpx.Limits | None = None
+    ) -> dict[str, Any]:
+        return {
+            "base_url": base_url.rstrip("/"),
+            "headers": {"X-API-Key": api_key},
+            "timeout": timeout,
+            "limits": limits or DEFAULT_LIMITS,
+            "http2": HTTP2_AVAILABLE,
+        }
+
+    @staticmethod
+    def _json_body(body: dict | bytes, accept: str | None = None) -> dict[str, Any]:
+        """``_request`` kwargs sending ``body`` as pre-serialized JSON.
+
+        ``body`` may already be encoded JSON bytes, which are sent as-is.
+        Either way it is serialized once per call: ``_request`` re-sends the
+        same built request on every retry.
+        """
+        headers = {"Content-Type": "application/json"}
+        if accept:
+            headers["Accept"] = accept
+        content = body if isinstance(body, bytes) else dumps(body)
+        return {"content": content, "headers": headers}
+
+    def _long_poll_kwargs(self, wait: int) -> dict[str, Any]:
+        """``_request`` kwargs asking the server to hold a GET up to ``wait`` s."""
+        t = self._client.timeout
+        read = None if t.read is None else t.read + wait
+        return {
+            "params": {"wait": wait},
+            "timeout": httpx.Timeout(connect=t.connect, read=read, write=t.write, pool=t.pool),
+        }
+
+    def _conditional_kwargs(self, path: str) -> dict[str, Any]:
+        """``_request`` kwargs revalidating the stored body of ``path``, if any."""
+        entry = self._etags.get(path)
+        return {"headers": {"If-None-Match": entry[0]}} if entry else {}
+
+    @classmethod
+    def _request_body(cls, body: dict | bytes, accept: str | None = None) -> dict[str, Any]:
+        """``_request`` kwargs for ``body``: multipart if it has raw files, else JSON."""
+        files = body.get("files") if isinstance(body, dict) else None
+        if files and any("bytes" in f for f in files):
+            return cls._multipart_body(body, accept)
+        return cls._json_body(body, accept)
+
+    @staticmethod
+    def _multipart_body(body: dict, accept: str | None = None) -> dict[str, Any]:
+        """``_request`` kwargs sending ``body`` as ``multipart/form-data``.
+
+        Scalar fields become form fields and each ``files`` entry becomes a
+        ``files`` part carrying raw bytes. Base64 ``content`` entries mixed
+        into the same list are decoded, so the whole upload is binary.
+        """
+        data = {k: v if isinstance(v, str) else str(v) for k, v in body.items() if k != "files"}
+        files = []
+        for f in body["files"]:
+            content = f["bytes"] if "bytes" in f else binascii.a2b_base64(f["content"])
+            files.append(("files", (f["name"], content, "application/octet-stream")))
+        return {"data": data, "files": files, "headers": {"Accept": accept} if accept else {}}
+
+    # -- response decoding -----------------------------------------------------
+
+    def _conditional_json(self, path: str, resp: httpx.Response) -> Any:
+        """Decode a conditional GET: reuse the stored body on 304, else store it."""
+        if resp.status_code == 304:
+            return self._etags[path][1]
+        data = loads(resp.content)
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._etags[path] = (etag, data)
+        return data
+
+    @staticmethod
+    def _split_pdf_response(resp: httpx.Response) -> tuple[bytes | None, dict]:
+        if "json" in resp.headers.get("content-type", ""):
+            return None, loads(resp.content)
 
-class HTTPClient:
+        return resp.content, _BaseHTTPClient._pdf_meta(resp.headers, len(resp.content))
+
+    @staticmethod
+    def _pdf_meta(headers: httpx.Headers, size: int) -> dict:
+        """Compile metadata of a binary PDF response, keyed like the JSON payload."""
+        return {
+            "engine": headers.get("X-FormaTex-Engine", ""),
+            "duration": int(float(headers.get("X-FormaTex-Duration") or 0)),
+            "jobId": headers.get("X-FormaTex-JobId", ""),
+            "sizeBytes": size,
+        }
+
+    # -- error mapping ---------------------------------------------------------
+
+    @staticmethod
+    def _raise_for_status(resp: httpx.Response) -> None:
+        # 304 only answers an If-None-Match sent by a conditional get_json.
+        if resp.is_success or resp.status_code == 304:
+            return
+
+        # Parse once, and only when the server says it is JSON: 422 bodies can
+        # carry megabytes of TeX log. Otherwise quote the start of the body.
+        body: Any = {}
+        if "json" in resp.headers.get("content-type", ""):
+            try:
+                body = loads(resp.content)
+            except ValueError:
+                pass
+        if not isinstance(body, dict):
+            body = {}
+        msg = body.get("error") or resp.content[:200].decode("utf-8", "replace")
+
+        build = _ERROR_BUILDERS.get(resp.status_code)
+        if build is not None:
+            raise build(msg, body, resp)
+        raise FormaTexError(msg, status_code=resp.status_code, body=body)
+
+
+class HTTPClient(_BaseHTTPClient):
     """Thin wrapper around httpx providing auth and error mapping."""
 
-    def __init__(self, api_key: str, base_url: str, timeout: float):
-        self._client = httpx.Client(
-            base_url=base_url.rstrip("/"),
-            headers={"X-API-Key": api_key},
-            timeout=timeout,
-        )
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        timeout: float,
+        *,
+        max_retries: int = 0,
+        rate_limit: float | None = None,
+        limits: httpx.Limits | None = None,
+    ):
+        self._client = httpx.Client(**self._client_kwargs(api_key, base_url, timeout, limits))
+        self._init_throttle(max_retries, rate_limit)
 
     def close(self) -> None:
         self._client.close()
 
+    def _request(self, method: str, path: str, *, stream: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send a request through the rate limiter, retrying on 429.
+
+        With ``stream=True`` the body of a successful response is left unread;
+        the caller must close the response.
+        """
+        request = self._client.build_request(method, path, **kwargs)
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                time.sleep(self._bucket.reserve())
+            resp = self._client.send(request, stream=stream)
+            if stream and not resp.is_success:
+                resp.read()
+                resp.close()
+            try:
+                self._raise_for_status(resp)
+            except RateLimitError as exc:
+                delay = self._retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return resp
+
     # -- helpers ---------------------------------------------------------------
 
-    def get_json(self, path: str) -> dict:
-        resp = self._client.get(path)
-        self._raise_for_status(resp)
-        return resp.json()
+    def get_json(self, path: str, *, conditional: bool = False, wait: int | None = None) -> dict:
+        """GET, expect JSON back.
+
+        With ``conditional=True`` the response ``ETag`` is remembered and the
+        next GET of ``path`` sends ``If-None-Match``; a ``304 Not Modified``
+        returns the previously decoded body. Only use it for a fixed set of
+        paths, as one entry is kept per path.
+
+        With ``wait`` the request carries ``?wait=<wait>`` so a long-polling
+        server can hold it until the resource changes; the read timeout is
+        extended by ``wait`` seconds.
+        """
+        if wait is not None:
+            return loads(self._request("GET", path, **self._long_poll_kwargs(wait)).content)
+        if not conditional:
+            return loads(self._request("GET", path).content)
+        resp = self._request("GET", path, **self._conditional_kwargs(path))
+        return self._conditional_json(path, resp)
 
     def get_bytes(self, path: str) -> bytes:
         """GET a binary response (e.g. PDF download)."""
-        resp = self._client.get(path)
-        self._raise_for_status(resp)
+        resp = self._request("GET", path)
         return resp.content
 
-    def post_json(self, path: str, body: dict) -> dict:
+    def post_json(self, path: str, body: dict | bytes) -> dict:
         """POST with JSON body, expect JSON back."""
-        resp = self._client.post(
-            path,
-            json=body,
-            headers={"Accept": "application/json"},
-        )
-        self._raise_for_status(resp)
-        return resp.json()
-
-    def post_bytes(self, path: str, body: dict) -> bytes:
+        resp = self._request("POST", path, **self._request_body(body, "application/json"))
+        return loads(resp.content)
+
+    def post_pdf(self, path: str, body: dict | bytes) -> tuple[bytes | None, dict]:
+        """POST with JSON body, asking for the PDF as a raw binary response.
+
+        Returns ``(pdf, meta)``. When the server honours ``Accept: application/pdf``,
+        ``pdf`` is the response body and ``meta`` is rebuilt from the
+        ``X-FormaTex-*`` headers using the same keys as the JSON payload.
+        When the server answers with JSON instead, ``pdf`` is ``None`` and
+        ``meta`` is the decoded body (still carrying the base64 ``pdf`` field).
+        """
+        resp = self._request("POST", path, **self._request_body(body, PDF_ACCEPT))
+        return self._split_pdf_response(resp)
+
+    def post_stream_to(
+        self, path: str, body: dict | bytes, dest: Path, chunk_size: int = 64 * 1024
+    ) -> tuple[int | None, dict]:
+        """POST with JSON body and stream a raw PDF response into file ``dest``.
+
+        The PDF is copied chunk by chunk and never held in memory whole,
+        into a temporary file beside ``dest`` that replaces it only once the
+        body is complete, so API errors and dropped connections leave an
+        existing file untouched. Returns
+        ``(written, meta)`` with the number of bytes written and the
+        ``X-FormaTex-*`` metadata. If the server answers with JSON instead,
+        nothing is written: ``written`` is ``None`` and ``meta`` is the
+        decoded body.
+        """
+        resp = self._request("POST", path, stream=True, **self._request_body(body, PDF_ACCEPT))
+        try:
+            if "json" in resp.headers.get("content-type", ""):
+                return None, loads(resp.read())
+            written = 0
+            partial = _partial_path(dest)
+            try:
+                with partial.open("xb") as sink:
+                    for chunk in resp.iter_bytes(chunk_size):
+                        sink.write(chunk)
+                        written += len(chunk)
+                os.replace(partial, dest)
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+            return written, self._pdf_meta(resp.headers, written)
+        finally:
+            resp.close()
+
+    def post_bytes(self, path: str, body: dict | bytes) -> bytes:
         """POST with JSON body, get raw bytes back (e.g. DOCX)."""
-        resp = self._client.post(path, json=body)
-        self._raise_for_status(resp)
+        resp = self._request("POST", path, **self._request_body(body))
         return resp.content
 
     def delete_json(self, path: str) -> dict:
         """DELETE, expect JSON back (or empty body on 204)."""
-        resp = self._client.delete(path)
-        self._raise_for_status(resp)
+        resp = self._request("DELETE", path)
         if resp.status_code == 204 or not resp.content:
             return {}
-        return resp.json()
+        return loads(resp.content)
 
-    # -- error mapping ---------------------------------------------------------
 
-    @staticmethod
-    def _raise_for_status(resp: httpx.Response) -> None:
-        if resp.is_success:
-            return
+class AsyncHTTPClient(_BaseHTTPClient):
+    """Asyncio counterpart of :class:`HTTPClient`, backed by ``httpx.AsyncClient``."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        timeout: float,
+        *,
+        max_retries: int = 0,
+        rate_limit: float | None = None,
+        limits: httpx.Limits | None = None,
+    ):
+        self._client = httpx.AsyncClient(**self._client_kwargs(api_key, base_url, timeout, limits))
+        self._init_throttle(max_retries, rate_limit)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
+    async def _request(
+        self, method: str, path: str, *, stream: bool = False, **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request through the rate limiter, retrying on 429.
+
+        With ``stream=True`` the body of a successful response is left unread;
+        the caller must close the response.
+        """
+        request = self._client.build_request(method, path, **kwargs)
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                await asyncio.sleep(self._bucket.reserve())
+            resp = await self._client.send(request, stream=stream)
+            if stream and not resp.is_success:
+                await resp.aread()
+                await resp.aclose()
+            try:
+                self._raise_for_status(resp)
+            except RateLimitError as exc:
+                delay = self._retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            return resp
+
+    # -- helpers ---------------------------------------------------------------
+
+    async def get_json(self, path: str, *, conditional: bool = False, wait: int | None = None) -> dict:
+        """GET, expect JSON back. See :meth:`HTTPClient.get_json`."""
+        if wait is not None:
+            return loads((await self._request("GET", path, **self._long_poll_kwargs(wait))).content)
+        if not conditional:
+            return loads((await self._request("GET", path)).content)
+        resp = await self._request("GET", path, **self._conditional_kwargs(path))
+        return self._conditional_json(path, resp)
+
+    async def get_bytes(self, path: str) -> bytes:
+        """GET a binary response (e.g. PDF download)."""
+        resp = await self._request("GET", path)
+        return resp.content
+
+    async def post_json(self, path: str, body: dict | bytes) -> dict:
+        """POST with JSON body, expect JSON back."""
+        resp = await self._request("POST", path, **self._request_body(body, "application/json"))
+        return loads(resp.content)
+
+    async def post_pdf(self, path: str, body: dict | bytes) -> tuple[bytes | None, dict]:
+        """POST with JSON body, asking for the PDF as a raw binary response.
+
+        See :meth:`HTTPClient.post_pdf` for the return value.
+        """
+        resp = await self._request("POST", path, **self._request_body(body, PDF_ACCEPT))
+        return self._split_pdf_response(resp)
+
+    async def post_stream_to(
+        self, path: str, body: dict | bytes, dest: Path, chunk_size: int = 64 * 1024
+    ) -> tuple[int | None, dict]:
+        """POST and stream a raw PDF response into file ``dest``.
+
+        File I/O runs in worker threads so the event loop is not blocked.
+        See :meth:`HTTPClient.post_stream_to` for the return value.
+        """
+        resp = await self._request("POST", path, stream=True, **self._request_body(body, PDF_ACCEPT))
         try:
-            body = resp.json()
-        except Exception:
-            body = {}
-        msg = body.get("error", resp.text[:200])
-
-        if resp.status_code == 401:
-            raise AuthenticationError(msg, status_code=401, body=body)
-        if resp.status_code == 403:
-            raise PlanLimitError(msg, status_code=403, body=body)
-        if resp.status_code == 422:
-            raise CompilationError(
-                msg,
-                log=body.get("log", ""),
-                status_code=422,
-                body=body,
-            )
-        if resp.status_code == 429:
-            retry = float(resp.headers.get("Retry-After", "0"))
-            raise RateLimitError(msg, retry_after=retry, status_code=429, body=body)
+            if "json" in resp.headers.get("content-type", ""):
+                return None, loads(await resp.aread())
+            written = 0
+            partial = _partial_path(dest)
+            try:
+                sink = await asyncio.to_thread(partial.open, "xb")
+                try:
+                    async for chunk in resp.aiter_bytes(chunk_size):
+                        await asyncio.to_thread(sink.write, chunk)
+                        written += len(chunk)
+                finally:
+                    await asyncio.to_thread(sink.close)
+                await asyncio.to_thread(os.replace, partial, dest)
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+            return written, self._pdf_meta(resp.headers, written)
+        finally:
+            await resp.aclose()
 
-        raise FormaTexError(msg, status_code=resp.status_code, body=body)
+    async def post_bytes(self, path: str, body: dict | bytes) -> bytes:
+        """POST with JSON body, get raw bytes back (e.g. DOCX)."""
+        resp = await self._request("POST", path, **self._request_body(body))
+        return resp.content
+
+    async def delete_json(self, path: str) -> dict:
+        """DELETE, expect JSON back (or empty body on 204)."""
+        resp = await self._request("DELETE", path)
+        if resp.status_code == 204 or not resp.content:
+            return {}
+        return loads(resp.content)
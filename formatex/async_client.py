@@ -0,0 +1,361 @@
+"""FormaTex asyncio client."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+import httpx
+
+from formatex._cache import CacheOption, ResponseCache, account_key, make_cache, source_key
+from formatex._http import AsyncHTTPClient
+from formatex.exceptions import FormaTexError
+from formatex.client import (
+    DEFAULT_BASE_URL,
+    LONG_POLL_WAIT,
+    _LONG_POLL_HELD,
+    AsyncJob,
+    CompileResult,
+    ConvertResult,
+    JobResult,
+    LintResult,
+    SyntaxResult,
+    UsageStats,
+    _async_job,
+    _batch_body,
+    _compile_body,
+    _compile_result,
+    _convert_body,
+    _job_failed_error,
+    _job_result,
+    _job_results,
+    _jobs_path,
+    _job_timeout_error,
+    _lint_result,
+    _local_syntax_check,
+    _next_poll_interval,
+    _preamble_key,
+    _syntax_result,
+    _syntax_results,
+    _usage_stats,
+)
+
+_T = TypeVar("_T")
+
+
+class AsyncFormaTexClient:
+    """Asyncio client for the FormaTex LaTeX-to-PDF API.
+
+    Mirrors :class:`~formatex.FormaTexClient` method for method, with every
+    API call as a coroutine. Requests share one pooled ``httpx.AsyncClient``,
+    so many documents can be compiled concurrently::
+
+        import asyncio
+        from formatex import AsyncFormaTexClient
+
+        async def main(docs):
+            async with AsyncFormaTexClient("fx_your_api_key") as client:
+                return await asyncio.gather(*(client.compile(d) for d in docs))
+
+        results = asyncio.run(main(docs))
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        timeout: float = 120.0,
+        cache: CacheOption = False,
+        max_retries: int = 5,
+        rate_limit: float | None = None,
+        limits: httpx.Limits | None = None,
+    ):
+        self._http = AsyncHTTPClient(
+            api_key=api_key,
+            base_url=DEFAULT_BASE_URL,
+            timeout=timeout,
+            max_retries=max_retries,
+            rate_limit=rate_limit,
+            limits=limits,
+        )
+        self._cache = make_cache(cache)
+        self._cache_ns = account_key(api_key)  # keeps a shared cache's accounts apart
+        self._engines = ResponseCache(maxsize=256, ttl=float("inf"))  # preamble → engine
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._http.aclose()
+
+    def clear_cache(self) -> None:
+        """Drop all memoized responses (no-op when caching is disabled)."""
+        if self._cache is not None:
+            self._cache.clear()
+
+    async def _cached(self, key: Hashable, fetch: Callable[[], Awaitable[_T]]) -> _T:
+        if self._cache is None:
+            return await fetch()
+        key = (self._cache_ns, key)
+        value = self._cache.get(key)
+        if value is None:
+            value = await fetch()
+            self._cache.set(key, value)
+        return value
+
+    async def __aenter__(self) -> "AsyncFormaTexClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    # ── Sync Compilation ──────────────────────────────────────────────────────
+
+    async def compile(
+        self,
+        latex: str,
+        *,
+        engine: str = "pdflatex",
+        timeout: int | None = None,
+        runs: int | None = None,
+        files: list[dict] | None = None,
+    ) -> CompileResult:
+        """Compile LaTeX source to PDF. See :meth:`FormaTexClient.compile`."""
+        body = _compile_body(latex, engine=engine, timeout=timeout, runs=runs, files=files)
+
+        data = await self._http.post_json("/api/v1/compile", body)
+        return _compile_result(data, engine=engine)
+
+    async def compile_binary(
+        self,
+        latex: str,
+        *,
+        engine: str = "pdflatex",
+        timeout: int | None = None,
+        runs: int | None = None,
+        files: list[dict] | None = None,
+    ) -> CompileResult:
+        """Compile with a raw PDF download. See :meth:`FormaTexClient.compile_binary`."""
+        body = _compile_body(latex, engine=engine, timeout=timeout, runs=runs, files=files)
+
+        pdf, data = await self._http.post_pdf("/api/v1/compile", body)
+        return _compile_result(data, engine=engine, pdf=pdf)
+
+    async def compile_smart(
+        self,
+        latex: str,
+        *,
+        timeout: int | None = None,
+        files: list[dict] | None = None,
+        reuse_engine: bool = False,
+    ) -> CompileResult:
+        """Smart compile with engine auto-detection. See :meth:`FormaTexClient.compile_smart`."""
+        if reuse_engine:
+            key = _preamble_key(latex)
+            engine = self._engines.get(key)
+            if engine is not None:
+                return await self.compile(latex, engine=engine, timeout=timeout, files=files)
+
+        body = _compile_body(latex, engine="auto", timeout=timeout, files=files)
+
+        data = await self._http.post_json("/api/v1/compile/smart", body)
+        result = _compile_result(data, engine="auto")
+        if reuse_engine and result.engine != "auto":
+            self._engines.set(key, result.engine)
+        return result
+
+    async def compile_to_file(
+        self,
+        latex: str,
+        output_path: str | Path,
+        *,
+        engine: str = "pdflatex",
+        smart: bool = False,
+        **kwargs: Any,
+    ) -> CompileResult:
+        """Compile and stream the PDF to a file. See :meth:`FormaTexClient.compile_to_file`."""
+        path, engine = ("/api/v1/compile/smart", "auto") if smart else ("/api/v1/compile", engine)
+        body = _compile_body(latex, engine=engine, **kwargs)
+
+        written, data = await self._http.post_stream_to(path, body, Path(output_path))
+        if written is None:
+            result = _compile_result(data, engine=engine)
+            await asyncio.to_thread(Path(output_path).write_bytes, result.pdf)
+            return result
+        return _compile_result(data, engine=engine, pdf=b"")
+
+    # ── Async Compilation ─────────────────────────────────────────────────────
+
+    async def async_compile(
+        self,
+        latex: str,
+        *,
+        engine: str = "pdflatex",
+        timeout: int | None = None,
+        runs: int | None = None,
+        files: list[dict] | None = None,
+    ) -> AsyncJob:
+        """Submit a background compilation job. See :meth:`FormaTexClient.async_compile`."""
+        body = _compile_body(latex, engine=engine, timeout=timeout, runs=runs, files=files)
+
+        data = await self._http.post_json("/api/v1/compile/async", body)
+        return _async_job(data)
+
+    async def async_compile_many(self, items: list[dict]) -> list[AsyncJob]:
+        """Submit several jobs in one request. See :meth:`FormaTexClient.async_compile_many`."""
+        if not items:
+            return []
+        try:
+            data = await self._http.post_json("/api/v1/compile/async/batch", _batch_body(items))
+        except FormaTexError as exc:
+            if exc.status_code != 404:
+                raise
+            return list(await asyncio.gather(*(self.async_compile(**item) for item in items)))
+        return [_async_job(job) for job in data.get("jobs", [])]
+
+    async def get_job(self, job_id: str) -> JobResult:
+        """Poll the status of an async job. See :meth:`FormaTexClient.get_job`."""
+        data = await self._http.get_json(f"/api/v1/jobs/{job_id}")
+        return _job_result(data, job_id)
+
+    async def get_jobs(self, job_ids: list[str]) -> list[JobResult]:
+        """Poll several async jobs in one request. See :meth:`FormaTexClient.get_jobs`."""
+        if not job_ids:
+            return []
+        try:
+            data = await self._http.get_json(_jobs_path(job_ids))
+        except FormaTexError as exc:
+            if exc.status_code != 404:
+                raise
+            return list(await asyncio.gather(*(self.get_job(job_id) for job_id in job_ids)))
+        return _job_results(data, job_ids)
+
+    async def get_job_pdf(self, job_id: str) -> bytes:
+        """Download (and delete) the PDF of a completed job. See :meth:`FormaTexClient.get_job_pdf`."""
+        return await self._http.get_bytes(f"/api/v1/jobs/{job_id}/pdf")
+
+    async def get_job_log(self, job_id: str) -> str:
+        """Fetch the compiler log of a job. See :meth:`FormaTexClient.get_job_log`."""
+        data = await self._http.get_json(f"/api/v1/jobs/{job_id}/log")
+        return data.get("log", "")
+
+    async def delete_job(self, job_id: str) -> None:
+        """Delete a job and its files. See :meth:`FormaTexClient.delete_job`."""
+        await self._http.delete_json(f"/api/v1/jobs/{job_id}")
+
+    async def wait_for_job(
+        self,
+        job_id: str,
+        *,
+        poll_interval: float = 2.0,
+        timeout: float = 300.0,
+        download_pdf: bool = True,
+    ) -> CompileResult:
+        """Wait for an async job to finish and return the result.
+
+        Same semantics as :meth:`FormaTexClient.wait_for_job`, but sleeps with
+        :func:`asyncio.sleep` so other jobs progress while this one waits.
+        """
+        sent = time.monotonic()
+        deadline = sent + timeout
+        interval = poll_interval
+
+        while True:
+            wait = int(min(LONG_POLL_WAIT, max(deadline - sent, 1)))
+            job = _job_result(await self._http.get_json(f"/api/v1/jobs/{job_id}", wait=wait), job_id)
+
+            if job.status == "completed":
+                pdf = await self.get_job_pdf(job_id) if download_pdf else b""
+                return CompileResult(
+                    pdf=pdf,
+                    engine="",
+                    duration_ms=job.duration_ms,
+                    size_bytes=len(pdf),
+                    job_id=job_id,
+                    log=job.log,
+                )
+
+            if job.status == "failed":
+                raise _job_failed_error(job)
+
+            now = time.monotonic()
+            if now >= deadline:
+                raise _job_timeout_error(job, timeout)
+            if now - sent >= wait * _LONG_POLL_HELD:  # the server held the request
+                sent = now
+                continue
+
+            await asyncio.sleep(interval)
+            sent = now + interval
+            interval = _next_poll_interval(interval, poll_interval)
+
+    # ── Syntax Check ─────────────────────────────────────────────────────────
+
+    async def check_syntax(self, latex: str, *, local_fastpath: bool = False) -> SyntaxResult:
+        """Validate LaTeX syntax without compiling. See :meth:`FormaTexClient.check_syntax`."""
+        if local_fastpath:
+            local = _local_syntax_check(latex)
+            if local is not None:
+                return local
+
+        async def fetch() -> SyntaxResult:
+            return _syntax_result(await self._http.post_json("/api/v1/compile/check", {"latex": latex}))
+
+        return await self._cached(source_key("/api/v1/compile/check", latex), fetch)
+
+    async def check_syntax_batch(self, latexes: list[str]) -> list[SyntaxResult]:
+        """Validate several documents in one request. See :meth:`FormaTexClient.check_syntax_batch`."""
+        if not latexes:
+            return []
+        data = await self._http.post_json("/api/v1/compile/check/batch", {"documents": latexes})
+        return _syntax_results(data, latexes)
+
+    # ── Lint ─────────────────────────────────────────────────────────────────
+
+    async def lint(self, latex: str) -> LintResult:
+        """Run ChkTeX static analysis. See :meth:`FormaTexClient.lint`."""
+        data = await self._http.post_json("/api/v1/lint", {"latex": latex})
+        return _lint_result(data)
+
+    # ── Convert ──────────────────────────────────────────────────────────────
+
+    async def convert(
+        self,
+        latex: str,
+        *,
+        files: list[dict] | None = None,
+    ) -> ConvertResult:
+        """Convert LaTeX source to DOCX. See :meth:`FormaTexClient.convert`."""
+        docx = await self._http.post_bytes("/api/v1/convert", _convert_body(latex, files=files))
+        return ConvertResult(docx=docx, size_bytes=len(docx))
+
+    async def convert_to_file(
+        self,
+        latex: str,
+        output_path: str | Path,
+        *,
+        files: list[dict] | None = None,
+    ) -> ConvertResult:
+        """Convert to DOCX and write it to a file. See :meth:`FormaTexClient.convert_to_file`."""
+        result = await self.convert(latex, files=files)
+        Path(output_path).write_bytes(result.docx)
+        return result
+
+    # ── Usage ────────────────────────────────────────────────────────────────
+
+    async def get_usage(self) -> UsageStats:
+        """Get current month's usage. See :meth:`FormaTexClient.get_usage`."""
+        async def fetch() -> UsageStats:
+            return _usage_stats(await self._http.get_json("/api/v1/usage", conditional=True))
+
+        return await self._cached("/api/v1/usage", fetch)
+
+    # ── Engines ──────────────────────────────────────────────────────────────
+
+    async def list_engines(self) -> list[dict]:
+        """List available compilation engines. See :meth:`FormaTexClient.list_engines`."""
+        async def fetch() -> list[dict]:
+            data = await self._http.get_json("/api/v1/engines", conditional=True)
+            return data.get("engines", [])
+
+        return await self._cached("/api/v1/engines", fetch)
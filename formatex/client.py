@@ -2,24 +2,60 @@
 
 from __future__ import annotations
 
-import base64
+import mmap
 import os
+import re
+import sys
+import threading
 import time
+from collections import Counter
 from dataclasses import dataclass, field
+from operator import attrgetter
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Hashable, TypeVar
 
+import httpx
+
+from formatex._cache import CacheOption, ResponseCache, account_key, make_cache, source_key
 from formatex._http import HTTPClient
-from formatex.exceptions import FormaTexError
+from formatex.exceptions import CompilationError, FormaTexError
+
+try:
+    # SIMD base64 codec (optional: pip install "formatex[fast]")
+    from pybase64 import b64decode as _b64decode, b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
+    # a2b_base64 reads the ASCII str in place; base64.b64decode would first
+    # copy the whole multi-MB payload through str.encode().
+    from binascii import a2b_base64 as _b64decode
 
 DEFAULT_BASE_URL = os.environ.get("FORMATEX_BASE_URL", "https://api.formatex.io")
 
+_T = TypeVar("_T")
+
+# wait_for_job: seconds a long-polling server may hold a job-status request,
+# the share of that wait a reply must take before we assume it was held (a
+# merely slow reply, or one delayed by throttling or a 429 retry, is not),
+# and the backoff ceiling used when the server answers without holding.
+LONG_POLL_WAIT = 30
+_LONG_POLL_HELD = 0.5
+MAX_POLL_INTERVAL = 5.0
+
 # ── Data classes ──────────────────────────────────────────────────────────────
 
+# Result objects are immutable and, on Python ≥ 3.10, slotted (no per-instance
+# __dict__), which keeps large lint results and job listings compact.
+_RESULT = {"frozen": True, "slots": True} if sys.version_info >= (3, 10) else {"frozen": True}
 
-@dataclass
+
+@dataclass(**_RESULT)
 class CompileResult:
-    """Result of a synchronous compilation request."""
+    """Result of a synchronous compilation request.
+
+    ``pdf`` may be given as the base64 string from a JSON response; it is
+    decoded on first access, so callers that only look at ``engine``,
+    ``log`` or ``size_bytes`` never pay for the decode.
+    """
 
     pdf: bytes
     engine: str
@@ -30,7 +66,37 @@ class CompileResult:
     analysis: dict | None = None  # present only for smart compile
 
 
-@dataclass
+class _LazyPdf:
+    """Data descriptor for ``CompileResult.pdf`` that decodes base64 on first read.
+
+    Wraps the field's slot (or the instance ``__dict__`` on Python < 3.10),
+    so the dataclass ``__init__``, ``__eq__`` and ``__repr__`` all see the
+    decoded bytes through ordinary attribute access.
+    """
+
+    def __init__(self, slot: Any = None):
+        self._slot = slot
+
+    def __get__(self, obj: Any, owner: Any = None) -> Any:
+        if obj is None:
+            return self
+        value = self._slot.__get__(obj, owner) if self._slot else obj.__dict__["pdf"]
+        if isinstance(value, str):
+            value = _b64decode(value)
+            self.__set__(obj, value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        if self._slot:
+            self._slot.__set__(obj, value)
+        else:
+            obj.__dict__["pdf"] = value
+
+
+CompileResult.pdf = _LazyPdf(vars(CompileResult).get("pdf"))  # type: ignore[assignment]
+
+
+@dataclass(**_RESULT)
 class AsyncJob:
     """Reference to an async compilation job (returned immediately on submit)."""
 
@@ -38,7 +104,7 @@ class AsyncJob:
     status: str  # pending | processing | completed | failed
 
 
-@dataclass
+@dataclass(**_RESULT)
 class JobResult:
     """Full status of a polled async job."""
 
@@ -50,7 +116,7 @@ class JobResult:
     success: bool = False
 
 
-@dataclass
+@dataclass(**_RESULT)
 class LintDiagnostic:
     """A single lint issue reported by ChkTeX."""
 
@@ -62,7 +128,7 @@ class LintDiagnostic:
     code: str = ""
 
 
-@dataclass
+@dataclass(**_RESULT)
 class LintResult:
     """Result of a lint operation."""
 
@@ -72,15 +138,16 @@ class LintResult:
     warning_count: int = field(init=False)
 
     def __post_init__(self) -> None:
-        self.error_count = sum(1 for d in self.diagnostics if d.severity == "error")
-        self.warning_count = sum(1 for d in self.diagnostics if d.severity == "warning")
+        counts = Counter(map(attrgetter("severity"), self.diagnostics))  # one C-level pass
+        object.__setattr__(self, "error_count", counts["error"])
+        object.__setattr__(self, "warning_count", counts["warning"])
 
     @property
     def valid(self) -> bool:
         return self.error_count == 0
 
 
-@dataclass
+@dataclass(**_RESULT)
 class SyntaxResult:
     """Result of a fast syntax check (no quota cost)."""
 
@@ -89,7 +156,7 @@ class SyntaxResult:
     warnings: list[dict]
 
 
-@dataclass
+@dataclass(**_RESULT)
 class ConvertResult:
     """Result of a LaTeX → DOCX conversion."""
 
@@ -97,7 +164,7 @@ class ConvertResult:
     size_bytes: int
 
 
-@dataclass
+@dataclass(**_RESULT)
 class UsageStats:
     """Monthly usage statistics."""
 
@@ -112,12 +179,13 @@ class UsageStats:
 # ── Helper ────────────────────────────────────────────────────────────────────
 
 
-def file_entry(name: str, content: bytes | str | Path) -> dict:
+def file_entry(name: str, content: bytes | bytearray | memoryview | str | Path) -> dict:
     """Build a companion-file entry for multi-file compilation.
 
     Args:
         name: Filename as it appears in the LaTeX source (e.g. ``"fig.png"``).
-        content: Raw bytes, a file path, or an already-encoded base64 string.
+        content: Raw bytes (or any bytes-like buffer), a file path, or an
+            already-encoded base64 string.
 
     Returns:
         ``{"name": name, "content": "<base64>"}`` dict for the ``files`` list.
@@ -132,11 +200,241 @@ def file_entry(name: str, content: bytes | str | Path) -> dict:
             ],
         )
     """
+    if isinstance(content, str):  # already base64: passed through, no copy
+        return {"name": name, "content": content}
+    if isinstance(content, Path):
+        encoded = _encode_path(content)
+    else:
+        encoded = _b64encode(content).decode("ascii")
+    return {"name": name, "content": encoded}
+
+
+# Below this size a plain read beats the cost of setting up a mapping.
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _encode_path(path: Path) -> str:
+    """Base64-encode a file, feeding large ones to the encoder via mmap.
+
+    Mapping the file skips the intermediate ``bytes`` copy that
+    ``read_bytes()`` would make of a multi-MB asset.
+    """
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+            return _b64encode(f.read()).decode("ascii")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _b64encode(mm).decode("ascii")
+
+
+def file_entry_raw(name: str, content: bytes | Path) -> dict:
+    """Build a companion-file entry uploaded as raw bytes.
+
+    Like :func:`file_entry`, but without base64: when any entry in ``files``
+    comes from this helper, the request is sent as ``multipart/form-data``,
+    saving the encode and a third of the upload size.
+
+    Returns:
+        ``{"name": name, "bytes": <raw bytes>}`` dict for the ``files`` list.
+    """
     if isinstance(content, Path):
         content = content.read_bytes()
-    if isinstance(content, bytes):
-        content = base64.b64encode(content).decode()
-    return {"name": name, "content": content}
+    return {"name": name, "bytes": content}
+
+
+# Request bodies and response parsing are shared with the async client.
+
+
+def _compile_body(
+    latex: str,
+    *,
+    engine: str,
+    timeout: int | None = None,
+    runs: int | None = None,
+    files: list[dict] | None = None,
+) -> dict[str, Any]:
+    """Build the JSON body for the compile endpoints, omitting unset options."""
+    body: dict[str, Any] = {"latex": latex, "engine": engine}
+    if timeout is not None:
+        body["timeout"] = timeout
+    if runs is not None:
+        body["runs"] = runs
+    if files:
+        body["files"] = files
+    return body
+
+
+def _batch_body(items: list[dict]) -> dict[str, Any]:
+    """Build the JSON body for the batch async-compile endpoint."""
+    return {"jobs": [_compile_body(**{"engine": "pdflatex", **item}) for item in items]}
+
+
+def _async_job(data: dict) -> AsyncJob:
+    return AsyncJob(job_id=data["jobId"], status=data.get("status", "pending"))
+
+
+def _convert_body(latex: str, *, files: list[dict] | None = None) -> dict[str, Any]:
+    """Build the JSON body for the convert endpoint."""
+    body: dict[str, Any] = {"latex": latex}
+    if files:
+        body["files"] = files
+    return body
+
+
+def _preamble_key(latex: str) -> tuple[str, bytes]:
+    """Cache key for the engine detected from a document's preamble."""
+    return source_key("preamble", latex.partition("\\begin{document}")[0])
+
+
+def _compile_result(data: dict, *, engine: str, pdf: bytes | None = None) -> CompileResult:
+    """Build a :class:`CompileResult` from a compile response.
+
+    ``pdf`` is the raw body of a binary response; when omitted the PDF is
+    decoded from the base64 ``pdf`` field of a JSON response.
+    """
+    if pdf is None:
+        pdf = data["pdf"]  # base64, decoded lazily by CompileResult.pdf
+    return CompileResult(
+        pdf=pdf,
+        engine=data.get("engine") or engine,
+        duration_ms=data.get("duration", 0),
+        size_bytes=data.get("sizeBytes", 0),
+        job_id=data.get("jobId", ""),
+        log=data.get("log", ""),
+        analysis=data.get("analysis"),
+    )
+
+
+def _job_result(data: dict, job_id: str) -> JobResult:
+    get = (data.get("result") or {}).get  # bound once: wait_for_job polls this
+    return JobResult(
+        job_id=data.get("id", job_id),
+        status=data.get("status", "unknown"),
+        log=get("log", ""),
+        duration_ms=get("duration", 0),
+        error=get("error", ""),
+        success=get("success", False),
+    )
+
+
+def _jobs_path(job_ids: list[str]) -> str:
+    return "/api/v1/jobs?ids=" + ",".join(job_ids)
+
+
+def _job_results(data: dict, job_ids: list[str]) -> list[JobResult]:
+    by_id = {job.get("id"): job for job in data.get("jobs", [])}
+    return [_job_result(by_id.get(job_id, {}), job_id) for job_id in job_ids]
+
+
+def _next_poll_interval(interval: float, poll_interval: float) -> float:
+    return min(interval * 1.5, max(poll_interval, MAX_POLL_INTERVAL))
+
+
+def _job_failed_error(job: JobResult) -> CompilationError:
+    return CompilationError(
+        job.error or "compilation failed",
+        log=job.log,
+        status_code=422,
+        body={"log": job.log, "error": job.error},
+    )
+
+
+def _job_timeout_error(job: JobResult, timeout: float) -> FormaTexError:
+    return FormaTexError(
+        f"job {job.job_id} did not complete within {timeout}s (status: {job.status})",
+        status_code=None,
+    )
+
+
+def _syntax_result(data: dict) -> SyntaxResult:
+    return SyntaxResult(
+        valid=data.get("valid", False),
+        errors=data.get("errors", []),
+        warnings=data.get("warnings", []),
+    )
+
+
+def _syntax_results(data: dict, latexes: list[str]) -> list[SyntaxResult]:
+    results = data.get("results", [])
+    if len(results) != len(latexes):
+        raise FormaTexError(
+            f"batch syntax check returned {len(results)} results for {len(latexes)} documents",
+            body=data,
+        )
+    return [_syntax_result(r) for r in results]
+
+
+# Text whose \begin / \end are not environments: verbatim-like bodies,
+# \verb spans and comments. One left-to-right pattern, so a % inside
+# verbatim is kept and a commented-out \begin{verbatim} is not. A % only
+# starts a comment after an even run of backslashes (\% is a literal
+# percent, \\% a line break then a comment); group 3 keeps that run.
+_SKIP_RE = re.compile(
+    r"\\begin\{(verbatim\*?|Verbatim|lstlisting|minted|comment)\}.*?\\end\{\1\}"
+    r"|\\verb\*?([^a-zA-Z\s*])[^\n]*?\2"
+    r"|(?<!\\)((?:\\\\)*)%[^\n]*",
+    re.DOTALL,
+)
+# Definitions can legitimately hold half an environment
+# (\newcommand{\bi}{\begin{itemize}}); the server decides those.
+_DEFINES_RE = re.compile(
+    r"\\(?:(?:re)?newcommand|providecommand|(?:re)?newenvironment"
+    r"|(?:New|Renew|Provide|Declare)Document(?:Command|Environment)|[egx]?def|let|iffalse)(?![a-zA-Z])"
+)
+
+
+def _local_syntax_check(latex: str) -> SyntaxResult | None:
+    """Catch trivially broken input without a network round trip.
+
+    Returns an invalid :class:`SyntaxResult` for empty source or when the
+    ``\\begin{`` / ``\\end{`` counts differ (ignoring comments, verbatim
+    and ``\\verb``), and ``None`` when the server has to decide, including
+    for any source that defines macros or environments.
+    """
+    if not latex.strip():
+        message = "empty document"
+    else:
+        latex = _SKIP_RE.sub(lambda m: m.group(3) or "", latex)
+        begins, ends = latex.count("\\begin{"), latex.count("\\end{")
+        if begins == ends or _DEFINES_RE.search(latex):
+            return None
+        message = f"unbalanced environments: {begins} \\begin vs {ends} \\end"
+    return SyntaxResult(
+        valid=False,
+        errors=[{"line": 0, "message": message, "source": "local"}],
+        warnings=[],
+    )
+
+
+def _lint_diagnostic(d: dict) -> LintDiagnostic:
+    get = d.get  # bound once: large lint runs return thousands of these
+    return LintDiagnostic(
+        get("line", 0),
+        get("column", 0),
+        get("severity", "warning"),
+        get("message", ""),
+        get("source", "chktex"),
+        get("code", ""),
+    )
+
+
+def _lint_result(data: dict) -> LintResult:
+    return LintResult(
+        diagnostics=list(map(_lint_diagnostic, data.get("diagnostics") or ())),
+        duration_ms=data.get("duration", 0),
+    )
+
+
+def _usage_stats(data: dict) -> UsageStats:
+    comp = data.get("compilations", {})
+    period = data.get("period", {})
+    return UsageStats(
+        plan=data.get("plan", ""),
+        compilations_used=comp.get("used", data.get("compilationsUsed", 0)),
+        compilations_limit=comp.get("limit", data.get("compilationsLimit", 0)),
+        period_start=period.get("start", data.get("periodStart", "")),
+        period_end=period.get("end", data.get("periodEnd", "")),
+        raw=data,
+    )
 
 
 # ── Client ────────────────────────────────────────────────────────────────────
@@ -156,6 +454,24 @@ class FormaTexClient:
         with FormaTexClient("fx_your_api_key") as client:
             result = client.compile(r"\\documentclass{article}...")
             Path("out.pdf").write_bytes(result.pdf)
+
+    Pass ``cache=True`` (or a :class:`~formatex.ResponseCache`) to memoize
+    :meth:`check_syntax`, :meth:`list_engines` and :meth:`get_usage` for the
+    cache's TTL (60 s by default).
+
+    Rate-limited requests (429) are retried up to ``max_retries`` times,
+    waiting for the server's ``Retry-After`` (plus jitter) between attempts;
+    :class:`~formatex.RateLimitError` is raised once retries are exhausted or
+    the server asks for a pause longer than a minute. Set ``rate_limit`` to a
+    number of requests per second to throttle client-side before the server
+    has to push back.
+
+    With ``prewarm=True`` the constructor opens a connection in the
+    background (a conditional ``GET /api/v1/engines``), so the first real
+    call does not pay the TCP+TLS handshake.
+
+    ``limits`` replaces the connection-pool :class:`httpx.Limits` — e.g. a
+    longer ``keepalive_expiry`` for a long-lived client with idle gaps.
     """
 
     def __init__(
@@ -163,13 +479,55 @@ class FormaTexClient:
         api_key: str,
         *,
         timeout: float = 120.0,
+        cache: CacheOption = False,
+        max_retries: int = 5,
+        rate_limit: float | None = None,
+        limits: httpx.Limits | None = None,
+        prewarm: bool = False,
     ):
-        self._http = HTTPClient(api_key=api_key, base_url=DEFAULT_BASE_URL, timeout=timeout)
+        self._http = HTTPClient(
+            api_key=api_key,
+            base_url=DEFAULT_BASE_URL,
+            timeout=timeout,
+            max_retries=max_retries,
+            rate_limit=rate_limit,
+            limits=limits,
+        )
+        self._cache = make_cache(cache)
+        self._cache_ns = account_key(api_key)  # keeps a shared cache's accounts apart
+        self._engines = ResponseCache(maxsize=256, ttl=float("inf"))  # preamble → engine
+        self._prewarm: threading.Thread | None = None
+        if prewarm:
+            self._prewarm = threading.Thread(target=self._warm_up, daemon=True)
+            self._prewarm.start()
+
+    def _warm_up(self) -> None:
+        try:
+            self._http.get_json("/api/v1/engines", conditional=True)
+        except Exception:
+            pass  # best effort: the first real call reports any problem
 
     def close(self) -> None:
         """Close the underlying HTTP connection pool."""
+        if self._prewarm is not None:
+            self._prewarm.join(timeout=0.1)
         self._http.close()
 
+    def clear_cache(self) -> None:
+        """Drop all memoized responses (no-op when caching is disabled)."""
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _cached(self, key: Hashable, fetch: Callable[[], _T]) -> _T:
+        if self._cache is None:
+            return fetch()
+        key = (self._cache_ns, key)
+        value = self._cache.get(key)
+        if value is None:
+            value = fetch()
+            self._cache.set(key, value)
+        return value
+
     def __enter__(self) -> "FormaTexClient":
         return self
 
@@ -208,23 +566,45 @@ class FormaTexClient:
             :class:`~FormaTex.PlanLimitError`: Monthly quota or plan restriction.
             :class:`~FormaTex.AuthenticationError`: Invalid API key.
         """
-        body: dict[str, Any] = {"latex": latex, "engine": engine}
-        if timeout is not None:
-            body["timeout"] = timeout
-        if runs is not None:
-            body["runs"] = runs
-        if files:
-            body["files"] = files
+        body = _compile_body(latex, engine=engine, timeout=timeout, runs=runs, files=files)
 
         data = self._http.post_json("/api/v1/compile", body)
-        return CompileResult(
-            pdf=base64.b64decode(data["pdf"]),
-            engine=data.get("engine", engine),
-            duration_ms=data.get("duration", 0),
-            size_bytes=data.get("sizeBytes", 0),
-            job_id=data.get("jobId", ""),
-            log=data.get("log", ""),
-        )
+        return _compile_result(data, engine=engine)
+
+    def compile_binary(
+        self,
+        latex: str,
+        *,
+        engine: str = "pdflatex",
+        timeout: int | None = None,
+        runs: int | None = None,
+        files: list[dict] | None = None,
+    ) -> CompileResult:
+        """Compile LaTeX source to PDF, downloading the PDF as raw bytes.
+
+        Same as :meth:`compile`, but asks the server for ``application/pdf``
+        instead of a base64 string embedded in JSON. This skips the base64
+        round-trip (about a third fewer bytes on the wire and no decode pass).
+        Metadata is read from the ``X-FormaTex-*`` response headers; the
+        compiler ``log`` is not included in binary responses.
+
+        Falls back to the JSON response transparently if the server does not
+        support binary downloads.
+
+        Args:
+            latex: LaTeX source code.
+            engine: ``pdflatex`` (default), ``xelatex``, ``lualatex``, or ``latexmk``.
+            timeout: Max compile time in seconds (plan-limited).
+            runs: Number of compiler passes (1–5).
+            files: Companion files — use :func:`file_entry`.
+
+        Returns:
+            :class:`CompileResult` with ``.pdf`` bytes and metadata.
+        """
+        body = _compile_body(latex, engine=engine, timeout=timeout, runs=runs, files=files)
+
+        pdf, data = self._http.post_pdf("/api/v1/compile", body)
+        return _compile_result(data, engine=engine, pdf=pdf)
 
     def compile_smart(
         self,
@@ -232,6 +612,7 @@ class FormaTexClient:
         *,
         timeout: int | None = None,
         files: list[dict] | None = None,
+        reuse_engine: bool = False,
     ) -> CompileResult:
         """Smart compile — auto-detects the required engine from the preamble.
 
@@ -242,26 +623,27 @@ class FormaTexClient:
             latex: LaTeX source code.
             timeout: Max compile time in seconds.
             files: Companion files — use :func:`file_entry`.
+            reuse_engine: Remember the engine detected for this preamble and
+                compile later documents with the same preamble through
+                :meth:`compile` with that engine, skipping server-side
+                detection. Such results have ``analysis=None``.
 
         Returns:
             :class:`CompileResult` with ``.analysis`` dict describing detected engine.
         """
-        body: dict[str, Any] = {"latex": latex, "engine": "auto"}
-        if timeout is not None:
-            body["timeout"] = timeout
-        if files:
-            body["files"] = files
+        if reuse_engine:
+            key = _preamble_key(latex)
+            engine = self._engines.get(key)
+            if engine is not None:
+                return self.compile(latex, engine=engine, timeout=timeout, files=files)
+
+        body = _compile_body(latex, engine="auto", timeout=timeout, files=files)
 
         data = self._http.post_json("/api/v1/compile/smart", body)
-        return CompileResult(
-            pdf=base64.b64decode(data["pdf"]),
-            engine=data.get("engine", "auto"),
-            duration_ms=data.get("duration", 0),
-            size_bytes=data.get("sizeBytes", 0),
-            job_id=data.get("jobId", ""),
-            log=data.get("log", ""),
-            analysis=data.get("analysis"),
-        )
+        result = _compile_result(data, engine="auto")
+        if reuse_engine and result.engine != "auto":
+            self._engines.set(key, result.engine)
+        return result
 
     def compile_to_file(
         self,
@@ -272,21 +654,32 @@ class FormaTexClient:
         smart: bool = False,
         **kwargs: Any,
     ) -> CompileResult:
-        """Compile and write the PDF directly to a file.
+        """Compile and stream the PDF directly to a file.
+
+        The PDF is requested as raw ``application/pdf`` and copied to disk in
+        chunks, so large documents are never held in memory. If the server
+        only returns JSON, the decoded PDF is written instead.
 
         Args:
             latex: LaTeX source code.
             output_path: Destination path for the PDF (created/overwritten).
             engine: Engine to use (ignored when ``smart=True``).
-            smart: Use :meth:`compile_smart` instead of :meth:`compile`.
-            **kwargs: Forwarded to the underlying compile call.
+            smart: Use the smart-compile endpoint (see :meth:`compile_smart`).
+            **kwargs: ``timeout``, ``runs`` or ``files``, as for :meth:`compile`.
 
         Returns:
-            :class:`CompileResult` (same as compile).
+            :class:`CompileResult`. When the PDF was streamed, ``.pdf`` is empty
+            (``b""``) and ``size_bytes`` is the number of bytes written.
         """
-        result = self.compile_smart(latex, **kwargs) if smart else self.compile(latex, engine=engine, **kwargs)
-        Path(output_path).write_bytes(result.pdf)
-        return result
+        path, engine = ("/api/v1/compile/smart", "auto") if smart else ("/api/v1/compile", engine)
+        body = _compile_body(latex, engine=engine, **kwargs)
+
+        written, data = self._http.post_stream_to(path, body, Path(output_path))
+        if written is None:
+            result = _compile_result(data, engine=engine)
+            Path(output_path).write_bytes(result.pdf)
+            return result
+        return _compile_result(data, engine=engine, pdf=b"")
 
     # ── Async Compilation ─────────────────────────────────────────────────────
 
@@ -316,16 +709,32 @@ class FormaTexClient:
         Returns:
             :class:`AsyncJob` with ``job_id`` and initial ``status="pending"``.
         """
-        body: dict[str, Any] = {"latex": latex, "engine": engine}
-        if timeout is not None:
-            body["timeout"] = timeout
-        if runs is not None:
-            body["runs"] = runs
-        if files:
-            body["files"] = files
+        body = _compile_body(latex, engine=engine, timeout=timeout, runs=runs, files=files)
 
         data = self._http.post_json("/api/v1/compile/async", body)
-        return AsyncJob(job_id=data["jobId"], status=data.get("status", "pending"))
+        return _async_job(data)
+
+    def async_compile_many(self, items: list[dict]) -> list[AsyncJob]:
+        """Submit several compilation jobs in one request.
+
+        Each item holds :meth:`async_compile` arguments, e.g.
+        ``{"latex": src, "engine": "xelatex"}``. Jobs are enqueued through
+        ``/api/v1/compile/async/batch``; if the server does not offer it
+        (404), they are submitted one by one instead. Companion files must be
+        :func:`file_entry` (base64) entries.
+
+        Returns:
+            One :class:`AsyncJob` per item, in order.
+        """
+        if not items:
+            return []
+        try:
+            data = self._http.post_json("/api/v1/compile/async/batch", _batch_body(items))
+        except FormaTexError as exc:
+            if exc.status_code != 404:
+                raise
+            return [self.async_compile(**item) for item in items]
+        return [_async_job(job) for job in data.get("jobs", [])]
 
     def get_job(self, job_id: str) -> JobResult:
         """Poll the status of an async compilation job.
@@ -342,15 +751,26 @@ class FormaTexClient:
             :class:`~FormaTex.FormaTexError`: Job not found (expired or never existed).
         """
         data = self._http.get_json(f"/api/v1/jobs/{job_id}")
-        result = data.get("result") or {}
-        return JobResult(
-            job_id=data.get("id", job_id),
-            status=data.get("status", "unknown"),
-            log=result.get("log", ""),
-            duration_ms=result.get("duration", 0),
-            error=result.get("error", ""),
-            success=result.get("success", False),
-        )
+        return _job_result(data, job_id)
+
+    def get_jobs(self, job_ids: list[str]) -> list[JobResult]:
+        """Poll the status of several async jobs in one request.
+
+        Statuses are fetched through ``/api/v1/jobs?ids=...``; if the server
+        does not offer it (404), each job is polled with :meth:`get_job`.
+
+        Returns:
+            One :class:`JobResult` per ID, in order.
+        """
+        if not job_ids:
+            return []
+        try:
+            data = self._http.get_json(_jobs_path(job_ids))
+        except FormaTexError as exc:
+            if exc.status_code != 404:
+                raise
+            return [self.get_job(job_id) for job_id in job_ids]
+        return _job_results(data, job_ids)
 
     def get_job_pdf(self, job_id: str) -> bytes:
         """Download the PDF for a completed async job.
@@ -395,16 +815,23 @@ class FormaTexClient:
         *,
         poll_interval: float = 2.0,
         timeout: float = 300.0,
+        download_pdf: bool = True,
     ) -> CompileResult:
         """Block until an async job completes and return the result.
 
-        Polls :meth:`get_job` every ``poll_interval`` seconds. Downloads the PDF
-        automatically when the job reaches ``completed``.
+        Long-polls the job status (``?wait=30``), so the server can answer as
+        soon as the job changes. If it answers immediately instead, polling
+        backs off from ``poll_interval`` by 1.5× per check up to 5 seconds.
+        Downloads the PDF automatically when the job reaches ``completed``,
+        unless ``download_pdf=False``.
 
         Args:
             job_id: ID returned by :meth:`async_compile`.
-            poll_interval: Seconds between status checks (default 2).
+            poll_interval: Initial seconds between status checks (default 2).
             timeout: Maximum total wait time in seconds (default 300).
+            download_pdf: Set ``False`` to leave the PDF on the server (e.g. to
+                read :meth:`get_job_log` first, since the download deletes
+                the job); ``pdf`` is then ``b""``.
 
         Returns:
             :class:`CompileResult` with the compiled PDF bytes.
@@ -413,15 +840,16 @@ class FormaTexClient:
             :class:`~FormaTex.CompilationError`: If the job failed.
             :class:`~FormaTex.FormaTexError`: If the timeout is exceeded.
         """
-        from formatex.exceptions import CompilationError
-
-        deadline = time.monotonic() + timeout
+        sent = time.monotonic()
+        deadline = sent + timeout
+        interval = poll_interval
 
         while True:
-            job = self.get_job(job_id)
+            wait = int(min(LONG_POLL_WAIT, max(deadline - sent, 1)))
+            job = _job_result(self._http.get_json(f"/api/v1/jobs/{job_id}", wait=wait), job_id)
 
             if job.status == "completed":
-                pdf = self.get_job_pdf(job_id)
+                pdf = self.get_job_pdf(job_id) if download_pdf else b""
                 return CompileResult(
                     pdf=pdf,
                     engine="",
@@ -432,41 +860,66 @@ class FormaTexClient:
                 )
 
             if job.status == "failed":
-                raise CompilationError(
-                    job.error or "compilation failed",
-                    log=job.log,
-                    status_code=422,
-                    body={"log": job.log, "error": job.error},
-                )
+                raise _job_failed_error(job)
 
-            if time.monotonic() >= deadline:
-                raise FormaTexError(
-                    f"job {job_id} did not complete within {timeout}s (status: {job.status})",
-                    status_code=None,
-                )
+            now = time.monotonic()
+            if now >= deadline:
+                raise _job_timeout_error(job, timeout)
+            if now - sent >= wait * _LONG_POLL_HELD:  # the server held the request
+                sent = now
+                continue
 
-            time.sleep(poll_interval)
+            time.sleep(interval)
+            sent = now + interval
+            interval = _next_poll_interval(interval, poll_interval)
 
     # ── Syntax Check ─────────────────────────────────────────────────────────
 
-    def check_syntax(self, latex: str) -> SyntaxResult:
+    def check_syntax(self, latex: str, *, local_fastpath: bool = False) -> SyntaxResult:
         """Validate LaTeX syntax without compiling (free, no quota cost).
 
         Uses a fast parser pass — does not invoke TeX.
 
         Args:
             latex: LaTeX source code.
+            local_fastpath: Reject empty documents and mismatched
+                ``\\begin``/``\\end`` counts locally, without a request.
+                Local errors carry ``"source": "local"``.
 
         Returns:
             :class:`SyntaxResult` with ``valid`` flag and ``errors``/``warnings`` lists.
         """
-        data = self._http.post_json("/api/v1/compile/check", {"latex": latex})
-        return SyntaxResult(
-            valid=data.get("valid", False),
-            errors=data.get("errors", []),
-            warnings=data.get("warnings", []),
+        if local_fastpath:
+            local = _local_syntax_check(latex)
+            if local is not None:
+                return local
+        return self._cached(
+            source_key("/api/v1/compile/check", latex),
+            lambda: _syntax_result(self._http.post_json("/api/v1/compile/check", {"latex": latex})),
         )
 
+    def check_syntax_batch(self, latexes: list[str]) -> list[SyntaxResult]:
+        """Validate several documents in a single request.
+
+        One HTTP round trip for the whole list, instead of one per document.
+        To coalesce individual :meth:`check_syntax` calls automatically, see
+        :class:`~formatex.SyntaxCheckBatcher`.
+
+        Args:
+            latexes: LaTeX sources to check.
+
+        Returns:
+            One :class:`SyntaxResult` per input document, in the same order.
+
+        Raises:
+            :class:`~FormaTex.FormaTexError`: The server returned a different
+                number of results than documents sent.
+        """
+        if not latexes:
+            return []
+        data = self._http.post_json("/api/v1/compile/check/batch", {"documents": latexes})
+        return _syntax_results(data, latexes)
+
     # ── Lint ─────────────────────────────────────────────────────────────────
 
     def lint(self, latex: str) -> LintResult:
@@ -492,21 +945,7 @@ class FormaTexClient:
                 print(f"{result.error_count} error(s) found")
         """
         data = self._http.post_json("/api/v1/lint", {"latex": latex})
-        diagnostics = [
-            LintDiagnostic(
-                line=d.get("line", 0),
-                column=d.get("column", 0),
-                severity=d.get("severity", "warning"),
-                message=d.get("message", ""),
-                source=d.get("source", "chktex"),
-                code=d.get("code", ""),
-            )
-            for d in (data.get("diagnostics") or [])
-        ]
-        return LintResult(
-            diagnostics=diagnostics,
-            duration_ms=data.get("duration", 0),
-        )
+        return _lint_result(data)
 
     # ── Convert ──────────────────────────────────────────────────────────────
 
@@ -535,10 +974,7 @@ class FormaTexClient:
             result = client.convert(latex)
             Path("document.docx").write_bytes(result.docx)
         """
-        body: dict[str, Any] = {"latex": latex}
-        if files:
-            body["files"] = files
-        docx = self._http.post_bytes("/api/v1/convert", body)
+        docx = self._http.post_bytes("/api/v1/convert", _convert_body(latex, files=files))
         return ConvertResult(docx=docx, size_bytes=len(docx))
 
     def convert_to_file(
@@ -570,16 +1006,9 @@ class FormaTexClient:
         Returns:
             :class:`UsageStats` with plan info and compilation counts.
         """
-        data = self._http.get_json("/api/v1/usage")
-        comp = data.get("compilations", {})
-        period = data.get("period", {})
-        return UsageStats(
-            plan=data.get("plan", ""),
-            compilations_used=comp.get("used", data.get("compilationsUsed", 0)),
-            compilations_limit=comp.get("limit", data.get("compilationsLimit", 0)),
-            period_start=period.get("start", data.get("periodStart", "")),
-            period_end=period.get("end", data.get("periodEnd", "")),
-            raw=data,
+        return self._cached(
+            "/api/v1/usage",
+            lambda: _usage_stats(self._http.get_json("/api/v1/usage", conditional=True)),
         )
 
     # ── Engines ──────────────────────────────────────────────────────────────
@@ -590,6 +1019,8 @@ class FormaTexClient:
         Returns:
             List of engine info dicts (name, available, version, etc.).
         """
-        data = self._http.get_json("/api/v1/engines")
-        return data.get("engines", [])
+        return self._cached(
+            "/api/v1/engines",
+            lambda: self._http.get_json("/api/v1/engines", conditional=True).get("engines", []),
+        )
 
@@ -10,6 +10,11 @@ class FormaTexError(Exception):
         self.body = body or {}
 
 
+# Alternate spelling used in older docs; the same class, so either name
+# catches every error the SDK raises.
+FormatExError = FormaTexError
+
+
 class AuthenticationError(FormaTexError):
     """Invalid or missing API key (401)."""
 
@@ -0,0 +1,181 @@
+"""Session fixtures for the live-API (e2e) tests.
+
+The e2e account is bootstrapped once per test run, not once per process:
+under ``pytest -n`` every xdist worker reads the same API key from a
+directory the controller creates in :func:`pytest_configure`, and the
+controller deletes the account in :func:`pytest_sessionfinish` after all
+workers are done. Without xdist the single process plays both roles.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+
+BASE_URL = os.environ.get("FORMATEX_E2E_BASE_URL", "").strip().strip('"').strip("'").rstrip("/")
+if BASE_URL:
+    # The SDK reads its endpoint from the environment at import, so this
+    # must be set before formatex.client is first imported.
+    os.environ["FORMATEX_BASE_URL"] = BASE_URL
+
+from formatex import FormaTexClient, UsageStats  # noqa: E402
+from formatex._http import HTTP2_AVAILABLE  # noqa: E402
+
+# Set by the controller, inherited by xdist workers.
+_SHARED_DIR_ENV = "FORMATEX_E2E_SHARED_DIR"
+_BOOTSTRAP_TIMEOUT = 120.0
+
+
+def _is_worker(config: pytest.Config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if BASE_URL and not _is_worker(config):
+        os.environ[_SHARED_DIR_ENV] = tempfile.mkdtemp(prefix="formatex-e2e-")
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    shared = os.environ.get(_SHARED_DIR_ENV)
+    if not shared or _is_worker(session.config):
+        return
+    account = Path(shared) / "account.json"
+    if account.exists():
+        _delete_account(json.loads(account.read_text()))
+    shutil.rmtree(shared, ignore_errors=True)
+
+
+def _dashboard_client() -> httpx.Client:
+    """Client for the dashboard API; one keep-alive (HTTP/2 when h2 is installed) connection."""
+    return httpx.Client(
+        base_url=BASE_URL,
+        timeout=30,
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=30),
+    )
+
+
+def _create_account() -> dict:
+    """Check the API is up, register a unique test user, log in, and create an API key."""
+    run_id = uuid.uuid4().hex[:8]
+    email = f"sdk-e2e-{run_id}@test.FormaTex.internal"
+    password = f"E2eTest-{run_id}!"
+    name = f"SDK E2E {run_id}"
+
+    with _dashboard_client() as http:
+        # 0. Health check, on the connection the bootstrap reuses
+        resp = http.get("/api/v1/health", timeout=10)
+        assert resp.status_code == 200, f"API unreachable: {resp.status_code}"
+
+        # 1. Register
+        resp = http.post("/api/v1/auth/register", json={"name": name, "email": email, "password": password})
+        assert resp.status_code == 201, f"Register failed {resp.status_code}: {resp.text}"
+        jwt_token = resp.json().get("token")
+
+        # 2. Login (only when registration did not already return a JWT)
+        if not jwt_token:
+            resp = http.post("/api/v1/auth/login", json={"email": email, "password": password})
+            assert resp.status_code == 200, f"Login failed {resp.status_code}: {resp.text}"
+            jwt_token = resp.json()["token"]
+
+        # 3. Create API key (JWT-authenticated)
+        resp = http.post(
+            "/api/v1/users/me/api-keys",
+            json={"name": "sdk-e2e-key"},
+            headers={"Authorization": f"Bearer {jwt_token}"},
+        )
+        assert resp.status_code == 201, f"API key creation failed {resp.status_code}: {resp.text}"
+        raw_key = resp.json()["key"]
+        assert len(raw_key) >= 8, f"API key too short: {raw_key!r}"
+
+    return {"email": email, "password": password, "key": raw_key}
+
+
+def _delete_account(account: dict) -> None:
+    # Try self-delete; if the API doesn't support it, leave the user
+    # (test users on a staging environment are harmless and quota-free)
+    try:
+        with _dashboard_client() as http:
+            resp = http.post(
+                "/api/v1/auth/login",
+                json={"email": account["email"], "password": account["password"]},
+                timeout=15,
+            )
+            if resp.status_code == 200:
+                token = resp.json()["token"]
+                http.delete("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}, timeout=15)
+    except Exception:
+        pass  # teardown is best-effort
+
+
+def _shared_account(shared: Path) -> dict:
+    """The run's account: created by the first process to claim the lock, read by the rest."""
+    account = shared / "account.json"
+    try:
+        # O_EXCL creation is the lock: portable, and no extra dependency.
+        os.close(os.open(shared / "account.lock", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        deadline = time.monotonic() + _BOOTSTRAP_TIMEOUT
+        while not account.exists():
+            if time.monotonic() > deadline:
+                pytest.fail("timed out waiting for another worker to create the e2e account")
+            time.sleep(0.2)
+        return json.loads(account.read_text())
+
+    data = _create_account()
+    pending = account.with_suffix(".tmp")
+    pending.write_text(json.dumps(data))
+    os.replace(pending, account)  # atomic: readers never see a partial file
+    return data
+
+
+# ── Session-scoped setup: register → login → get API key ─────────────────────
+
+
+@pytest.fixture(scope="session")
+def api_key() -> str:
+    """
+    Full bootstrap fixture:
+      - Checks /api/v1/health
+      - Registers a unique test user (once per run, shared by xdist workers)
+      - Logs in to get a JWT
+      - Creates an API key
+      - Returns the raw API key string
+    The test user is deleted in ``pytest_sessionfinish``.
+    """
+    shared = os.environ.get(_SHARED_DIR_ENV)
+    if not shared:
+        pytest.skip("FORMATEX_E2E_BASE_URL not set — skipping e2e tests")
+    return _shared_account(Path(shared))["key"]
+
+
+@pytest.fixture(scope="session")
+def client(api_key: str) -> FormaTexClient:
+    """Shared FormaTexClient for the e2e session."""
+    # Long keep-alive: the pool stays warm across the gaps while jobs compile.
+    # prewarm opens the first connection (TLS + key auth) in the background,
+    # so the first test's timings don't include it.
+    limits = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300)
+    c = FormaTexClient(api_key, limits=limits, prewarm=True)
+    yield c
+    c.close()
+
+
+@pytest.fixture(scope="session")
+def engines_list(client: FormaTexClient) -> list:
+    """``list_engines()``, fetched once per session."""
+    return client.list_engines()
+
+
+@pytest.fixture(scope="session")
+def baseline_usage(client: FormaTexClient) -> UsageStats:
+    """``get_usage()`` at first use, fetched once per session; not for measuring deltas."""
+    return client.get_usage()
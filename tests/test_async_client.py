@@ -0,0 +1,252 @@
+"""Unit tests for the asyncio FormaTex client.
+
+The async HTTP transport is replaced with ``AsyncMock`` — no real API calls
+are made. Coroutines are driven with ``asyncio.run`` so no pytest plugin is
+required.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from formatex import (
+    AsyncFormaTexClient,
+    AsyncJob,
+    CompilationError,
+    CompileResult,
+    FormaTexError,
+    LintResult,
+    SyntaxResult,
+    UsageStats,
+)
+
+
+@pytest.fixture
+def client():
+    """AsyncFormaTexClient with a fully-mocked async HTTP layer."""
+    c = AsyncFormaTexClient("fx_test_key_abc")
+    c._http = AsyncMock()
+    return c
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+FAKE_PDF = b"%PDF-1.4 fake-content"
+FAKE_PDF_B64 = base64.b64encode(FAKE_PDF).decode()
+
+
+class TestCompile:
+    def test_returns_compile_result(self, client):
+        client._http.post_json.return_value = {
+            "pdf": FAKE_PDF_B64, "engine": "pdflatex", "duration": 312, "jobId": "job-1",
+        }
+        result = run(client.compile(r"\doc", runs=2))
+
+        assert isinstance(result, CompileResult)
+        assert result.pdf == FAKE_PDF
+        assert result.duration_ms == 312
+        path, body = client._http.post_json.call_args[0]
+        assert path == "/api/v1/compile"
+        assert body["runs"] == 2
+
+    def test_compile_binary_uses_raw_pdf(self, client):
+        client._http.post_pdf.return_value = (FAKE_PDF, {"engine": "xelatex"})
+        result = run(client.compile_binary(r"\doc", engine="xelatex"))
+        assert result.pdf == FAKE_PDF
+        assert result.engine == "xelatex"
+
+    def test_compile_smart_reuse_engine(self, client):
+        client._http.post_json.return_value = {"pdf": FAKE_PDF_B64, "engine": "lualatex"}
+        for body in ("A", "B"):
+            run(client.compile_smart(r"\usepackage{luacode}\begin{document}" + body, reuse_engine=True))
+        paths = [c[0][0] for c in client._http.post_json.await_args_list]
+        assert paths == ["/api/v1/compile/smart", "/api/v1/compile"]
+
+    def test_gather_runs_compiles_concurrently(self, client):
+        client._http.post_json.return_value = {"pdf": FAKE_PDF_B64}
+
+        async def main():
+            return await asyncio.gather(*(client.compile(f"doc {i}") for i in range(5)))
+
+        results = run(main())
+        assert [r.pdf for r in results] == [FAKE_PDF] * 5
+        assert client._http.post_json.await_count == 5
+
+    def test_compile_to_file_streams_pdf(self, client, tmp_path):
+        async def stream(path, body, dest):
+            dest.write_bytes(FAKE_PDF)
+            return len(FAKE_PDF), {"sizeBytes": len(FAKE_PDF)}
+
+        client._http.post_stream_to.side_effect = stream
+        out = tmp_path / "out.pdf"
+        result = run(client.compile_to_file(r"\doc", out, smart=True))
+        assert out.read_bytes() == FAKE_PDF
+        assert result.size_bytes == len(FAKE_PDF)
+        path, _, _ = client._http.post_stream_to.call_args[0]
+        assert path == "/api/v1/compile/smart"
+
+
+class TestAsyncJobs:
+    def test_async_compile_returns_job(self, client):
+        client._http.post_json.return_value = {"jobId": "async-1", "status": "pending"}
+        job = run(client.async_compile(r"\doc"))
+        assert job == AsyncJob(job_id="async-1", status="pending")
+
+    def test_async_compile_many(self, client):
+        client._http.post_json.return_value = {"jobs": [{"jobId": "a"}, {"jobId": "b"}]}
+        jobs = run(client.async_compile_many([{"latex": "a"}, {"latex": "b"}]))
+        assert [j.job_id for j in jobs] == ["a", "b"]
+        assert client._http.post_json.await_args[0][0] == "/api/v1/compile/async/batch"
+
+    def test_async_compile_many_falls_back_on_404(self, client):
+        client._http.post_json.side_effect = [
+            FormaTexError("not found", status_code=404),
+            {"jobId": "a"},
+            {"jobId": "b"},
+        ]
+        jobs = run(client.async_compile_many([{"latex": "a"}, {"latex": "b"}]))
+        assert [j.job_id for j in jobs] == ["a", "b"]
+
+    def test_get_jobs_batches_status_polls(self, client):
+        client._http.get_json.return_value = {"jobs": [
+            {"id": "b", "status": "completed"}, {"id": "a", "status": "processing"},
+        ]}
+        jobs = run(client.get_jobs(["a", "b"]))
+        assert [(j.job_id, j.status) for j in jobs] == [("a", "processing"), ("b", "completed")]
+        client._http.get_json.assert_awaited_once_with("/api/v1/jobs?ids=a,b")
+
+    def test_get_jobs_falls_back_on_404(self, client):
+        client._http.get_json.side_effect = [
+            FormaTexError("not found", status_code=404),
+            {"id": "a", "status": "pending"},
+            {"id": "b", "status": "pending"},
+        ]
+        jobs = run(client.get_jobs(["a", "b"]))
+        assert [j.job_id for j in jobs] == ["a", "b"]
+
+    def test_wait_for_job_polls_until_completed(self, client):
+        client._http.get_json.side_effect = [
+            {"id": "j1", "status": "processing", "result": None},
+            {"id": "j1", "status": "completed", "result": {"log": "OK", "duration": 800}},
+        ]
+        client._http.get_bytes.return_value = FAKE_PDF
+
+        with patch("formatex.async_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            result = run(client.wait_for_job("j1", poll_interval=2.0))
+
+        assert result.pdf == FAKE_PDF
+        assert result.duration_ms == 800
+        mock_sleep.assert_awaited_once_with(2.0)
+
+    def test_wait_for_job_slow_reply_still_backs_off(self, client):
+        # A server that ignores ?wait= but takes 1.5 s per reply is not long-polling.
+        client._http.get_json.side_effect = [
+            {"id": "j1", "status": "processing"},
+            {"id": "j1", "status": "processing"},
+            {"id": "j1", "status": "completed", "result": {}},
+        ]
+        client._http.get_bytes.return_value = FAKE_PDF
+
+        with patch("formatex.async_client.time") as mock_time, \
+                patch("formatex.async_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            mock_time.monotonic.side_effect = [0.0, 1.5, 5.0]  # start, then after each slow reply
+            run(client.wait_for_job("j1", poll_interval=2.0))
+
+        assert [c.args[0] for c in mock_sleep.await_args_list] == [2.0, 3.0]
+
+    def test_wait_for_job_without_download(self, client):
+        client._http.get_json.return_value = {"id": "j1", "status": "completed", "result": {"log": "OK"}}
+        result = run(client.wait_for_job("j1", download_pdf=False))
+        assert result.pdf == b""
+        client._http.get_bytes.assert_not_awaited()
+
+    def test_wait_for_job_raises_on_failure(self, client):
+        client._http.get_json.return_value = {
+            "id": "j1", "status": "failed", "result": {"error": "Undefined control sequence"},
+        }
+        with pytest.raises(CompilationError, match="Undefined control sequence"):
+            run(client.wait_for_job("j1"))
+
+    def test_wait_for_job_times_out(self, client):
+        client._http.get_json.return_value = {"id": "j1", "status": "processing"}
+        # Patch the module reference only: the event loop also reads time.monotonic.
+        with patch("formatex.async_client.time") as mock_time:
+            mock_time.monotonic.side_effect = [0.0, 999.0]
+            with pytest.raises(FormaTexError, match="did not complete within 10"):
+                run(client.wait_for_job("j1", timeout=10.0))
+
+
+class TestOtherEndpoints:
+    def test_check_syntax(self, client):
+        client._http.post_json.return_value = {"valid": True, "errors": [], "warnings": []}
+        assert run(client.check_syntax(r"\doc")) == SyntaxResult(valid=True, errors=[], warnings=[])
+
+    def test_check_syntax_local_fastpath(self, client):
+        result = run(client.check_syntax(r"\begin{document}", local_fastpath=True))
+        assert result.valid is False
+        client._http.post_json.assert_not_called()
+
+    def test_check_syntax_batch(self, client):
+        client._http.post_json.return_value = {"results": [{"valid": True}, {"valid": False}]}
+        results = run(client.check_syntax_batch(["a", "b"]))
+        assert [r.valid for r in results] == [True, False]
+
+    def test_check_syntax_batch_short_response_raises(self, client):
+        client._http.post_json.return_value = {"results": []}
+        with pytest.raises(FormaTexError):
+            run(client.check_syntax_batch(["a", "b"]))
+
+    def test_lint(self, client):
+        client._http.post_json.return_value = {
+            "diagnostics": [{"line": 1, "column": 2, "severity": "error", "message": "x"}],
+            "duration": 7,
+        }
+        result = run(client.lint(r"\doc"))
+        assert isinstance(result, LintResult)
+        assert result.error_count == 1
+
+    def test_convert(self, client):
+        client._http.post_bytes.return_value = b"PK\x03\x04"
+        result = run(client.convert(r"\doc"))
+        assert result.size_bytes == 4
+
+    def test_get_usage(self, client):
+        client._http.get_json.return_value = {"plan": "pro", "compilations": {"used": 3, "limit": 10}}
+        usage = run(client.get_usage())
+        assert isinstance(usage, UsageStats)
+        assert usage.compilations_used == 3
+
+    def test_list_engines(self, client):
+        client._http.get_json.return_value = {"engines": [{"name": "pdflatex"}]}
+        assert run(client.list_engines()) == [{"name": "pdflatex"}]
+
+
+class TestCache:
+    def test_memoizes_check_syntax(self):
+        c = AsyncFormaTexClient("fx_test_key_abc", cache=True)
+        c._http = AsyncMock()
+        c._http.post_json.return_value = {"valid": True, "errors": [], "warnings": []}
+
+        async def main():
+            await c.check_syntax(r"\doc")
+            await c.check_syntax(r"\doc")
+
+        run(main())
+        assert c._http.post_json.await_count == 1
+
+
+class TestContextManager:
+    def test_aclose_called_on_exit(self):
+        async def main():
+            async with AsyncFormaTexClient("fx_key") as c:
+                c._http = AsyncMock()
+            return c
+
+        c = run(main())
+        c._http.aclose.assert_awaited_once()
@@ -8,9 +8,14 @@ Coverage:  pytest --cov=FormaTex --cov-report=term-missing
 from __future__ import annotations
 
 import base64
+import functools
+import mmap
+from collections import namedtuple
 from pathlib import Path
-from unittest.mock import MagicMock, call, patch
+from types import MappingProxyType
+from unittest.mock import call, patch
 
+import httpx
 import pytest
 
 from formatex import (
@@ -26,26 +31,155 @@ from formatex import (
     LintResult,
     PlanLimitError,
     RateLimitError,
+    ResponseCache,
+    SyntaxCheckBatcher,
     SyntaxResult,
     UsageStats,
     file_entry,
+    file_entry_raw,
 )
+from formatex.client import DEFAULT_BASE_URL
 from formatex.exceptions import FormaTexError as _FormaTexError
 
 
+# ── HTTP stub ─────────────────────────────────────────────────────────────────
+
+
+class Recorded(namedtuple("Recorded", "args kwargs")):
+    """One recorded call; compares equal to the matching ``mock.call(...)``."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return tuple(self) == other  # a plain tuple lets mock.call's __eq__ decide
+
+    __hash__ = tuple.__hash__
+
+
+class StubCall:
+    """Recording stand-in for one ``HTTPClient`` method.
+
+    Supports the slice of the ``Mock`` API these tests use: ``return_value``,
+    ``side_effect`` (value, iterable, callable or exception), ``call_args``,
+    ``call_args_list``, ``call_count`` and the ``assert_*`` helpers. Calls
+    are recorded as :data:`Recorded` ``(args, kwargs)`` tuples, which compare
+    equal to ``unittest.mock.call(...)``; :attr:`body` is the payload of the
+    last call whether it was passed positionally or by keyword.
+    """
+
+    def __init__(self):
+        self.reset_mock(return_value=True, side_effect=True)
+
+    def reset_mock(self, *, return_value=False, side_effect=False):
+        self.call_args_list = []
+        if return_value:
+            self.return_value = None
+        if side_effect:
+            self.side_effect = None
+
+    def __call__(self, *args, **kwargs):
+        self.call_args_list.append(Recorded(args, kwargs))
+        effect = self.side_effect
+        if effect is None:
+            return self.return_value
+        if isinstance(effect, BaseException):
+            raise effect
+        if callable(effect):
+            return effect(*args, **kwargs)
+        if not hasattr(effect, "__next__"):
+            effect = self.side_effect = iter(effect)
+        value = next(effect)
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+    @property
+    def call_args(self):
+        return self.call_args_list[-1] if self.call_args_list else None
+
+    @property
+    def body(self):
+        args, kwargs = self.call_args
+        return args[1] if len(args) > 1 else kwargs["body"]
+
+    @property
+    def call_count(self):
+        return len(self.call_args_list)
+
+    def assert_not_called(self):
+        assert self.call_count == 0, f"expected no calls, got {self.call_args_list}"
+
+    def assert_called_once(self):
+        assert self.call_count == 1, f"expected one call, got {self.call_args_list}"
+
+    def assert_called_once_with(self, *args, **kwargs):
+        self.assert_called_once()
+        assert self.call_args == (args, kwargs), f"{self.call_args} != {(args, kwargs)}"
+
+
+class HTTPStub:
+    """Lean replacement for ``HTTPClient``: one :class:`StubCall` per method."""
+
+    METHODS = (
+        "get_json", "get_bytes", "post_json", "post_pdf",
+        "post_stream_to", "post_bytes", "delete_json", "close",
+    )
+
+    def __init__(self):
+        for name in self.METHODS:
+            setattr(self, name, StubCall())
+
+    def reset_mock(self, **kwargs):
+        for name in self.METHODS:
+            getattr(self, name).reset_mock(**kwargs)
+
+
 # ── Fixtures ──────────────────────────────────────────────────────────────────
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """FormaTexClient with a fully-mocked HTTP layer."""
+    """FormaTexClient with a stubbed HTTP layer, built once per module."""
     c = FormaTexClient("fx_test_key_abc")
-    c._http = MagicMock()
+    c._http = HTTPStub()
     return c
 
 
+@pytest.fixture(autouse=True)
+def _reset_client(client):
+    """Give every test a clean mock and empty client-side caches."""
+    client._http.reset_mock(return_value=True, side_effect=True)
+    client._engines.clear()
+
+
+@pytest.fixture(scope="module")
+def out_dir(tmp_path_factory):
+    """One output directory for the file-writing tests; each uses its own filename."""
+    return tmp_path_factory.mktemp("outputs")
+
+
+@functools.lru_cache(maxsize=None)
+def b64(raw: bytes) -> str:
+    """Expected ``file_entry`` content, computed with the stdlib encoder once per input."""
+    return base64.b64encode(raw).decode()
+
+
 FAKE_PDF = b"%PDF-1.4 fake-content"
-FAKE_PDF_B64 = base64.b64encode(FAKE_PDF).decode()
+FAKE_PDF_B64 = b64(FAKE_PDF)
+
+# Canonical API payloads. Read-only, so tests copy them (``dict(X)`` or
+# ``{**X, "engine": ...}``) instead of rebuilding the literals each time.
+COMPILE_OK = MappingProxyType({
+    "pdf": FAKE_PDF_B64,
+    "engine": "pdflatex",
+    "duration": 312,
+    "sizeBytes": len(FAKE_PDF),
+    "jobId": "job-1",
+    "log": "This is pdflatex...",
+})
+JOB_PENDING = MappingProxyType({"jobId": "async-1", "status": "pending"})
+JOB_PROCESSING = MappingProxyType({"id": "j1", "status": "processing", "result": None})
+SYNTAX_OK = MappingProxyType({"valid": True, "errors": [], "warnings": []})
 
 
 # ── file_entry helper ─────────────────────────────────────────────────────────
@@ -56,16 +190,29 @@ class TestFileEntry:
         raw = b"\x89PNG\r\n"
         entry = file_entry("img.png", raw)
         assert entry["name"] == "img.png"
-        assert entry["content"] == base64.b64encode(raw).decode()
+        assert entry["content"] == b64(raw)
 
     def test_from_path_reads_and_encodes(self, tmp_path):
         p = tmp_path / "logo.png"
         p.write_bytes(b"pngdata")
         entry = file_entry("logo.png", p)
-        assert entry["content"] == base64.b64encode(b"pngdata").decode()
+        assert entry["content"] == b64(b"pngdata")
+
+    def test_large_path_is_memory_mapped(self, tmp_path):
+        raw = bytes(range(256)) * 1024  # 256 KiB, above the mmap threshold
+        p = tmp_path / "figure.png"
+        p.write_bytes(raw)
+        with patch("formatex.client.mmap.mmap", wraps=mmap.mmap) as mock_mmap:
+            entry = file_entry("figure.png", p)
+        mock_mmap.assert_called_once()
+        assert entry["content"] == b64(raw)
+
+    @pytest.mark.parametrize("buf", [bytearray(b"\x89PNG"), memoryview(b"\x89PNG")])
+    def test_from_bytes_like_buffer(self, buf):
+        assert file_entry("img.png", buf)["content"] == b64(b"\x89PNG")
 
     def test_from_str_passthrough(self):
-        already_encoded = base64.b64encode(b"data").decode()
+        already_encoded = b64(b"data")
         entry = file_entry("data.bin", already_encoded)
         assert entry["content"] == already_encoded
 
@@ -73,52 +220,64 @@ class TestFileEntry:
         entry = file_entry("refs/main.bib", b"")
         assert entry["name"] == "refs/main.bib"
 
+    def test_raw_entry_keeps_bytes(self, tmp_path):
+        p = tmp_path / "logo.png"
+        p.write_bytes(b"pngdata")
+        assert file_entry_raw("logo.png", p) == {"name": "logo.png", "bytes": b"pngdata"}
+        assert file_entry_raw("a.bin", b"\x00") == {"name": "a.bin", "bytes": b"\x00"}
+
 
 # ── LintResult dataclass ───────────────────────────────────────────────────────
 
 
+# Two errors then a warning; tests take slices.
+LINT_DIAGS = (
+    LintDiagnostic(line=1, column=1, severity="error", message="e1"),
+    LintDiagnostic(line=2, column=1, severity="error", message="e2"),
+    LintDiagnostic(line=3, column=1, severity="warning", message="w1"),
+)
+
+
 class TestLintResult:
     def _make(self, diagnostics):
-        return LintResult(diagnostics=diagnostics, duration_ms=10)
-
-    def test_counts_errors_and_warnings(self):
-        diags = [
-            LintDiagnostic(line=1, column=1, severity="error", message="e1"),
-            LintDiagnostic(line=2, column=1, severity="error", message="e2"),
-            LintDiagnostic(line=3, column=1, severity="warning", message="w1"),
-        ]
+        return LintResult(diagnostics=list(diagnostics), duration_ms=10)
+
+    @pytest.mark.parametrize(
+        "diags, errors, warnings, valid",
+        [
+            (LINT_DIAGS, 2, 1, False),
+            (LINT_DIAGS[:1], 1, 0, False),
+            (LINT_DIAGS[2:], 0, 1, True),
+            ((), 0, 0, True),
+        ],
+        ids=["mixed", "errors-only", "warnings-only", "empty"],
+    )
+    def test_counts_and_validity(self, diags, errors, warnings, valid):
         result = self._make(diags)
-        assert result.error_count == 2
-        assert result.warning_count == 1
-
-    def test_valid_is_true_when_no_errors(self):
-        diags = [LintDiagnostic(line=1, column=1, severity="warning", message="w")]
-        assert self._make(diags).valid is True
+        assert result.error_count == errors
+        assert result.warning_count == warnings
+        assert result.valid is valid
 
-    def test_valid_is_false_when_errors_present(self):
-        diags = [LintDiagnostic(line=1, column=1, severity="error", message="e")]
-        assert self._make(diags).valid is False
+    def test_results_are_immutable(self):
+        import dataclasses
+        import sys
 
-    def test_empty_diagnostics(self):
         result = self._make([])
-        assert result.error_count == 0
-        assert result.warning_count == 0
-        assert result.valid is True
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.duration_ms = 1
+        if sys.version_info >= (3, 10):
+            assert not hasattr(result, "__dict__")
 
 
 # ── compile ───────────────────────────────────────────────────────────────────
 
 
+IMG_ENTRY = MappingProxyType(file_entry("img.png", b"data"))
+
+
 class TestCompile:
     def test_returns_compile_result(self, client):
-        client._http.post_json.return_value = {
-            "pdf": FAKE_PDF_B64,
-            "engine": "pdflatex",
-            "duration": 312,
-            "sizeBytes": len(FAKE_PDF),
-            "jobId": "job-1",
-            "log": "This is pdflatex...",
-        }
+        client._http.post_json.return_value = dict(COMPILE_OK)
         result = client.compile(r"\documentclass{article}\begin{document}Hi\end{document}")
 
         assert isinstance(result, CompileResult)
@@ -129,19 +288,21 @@ class TestCompile:
         assert result.job_id == "job-1"
         assert "pdflatex" in result.log
 
-    def test_sends_engine_and_optional_params(self, client):
-        client._http.post_json.return_value = {
-            "pdf": FAKE_PDF_B64, "engine": "xelatex",
-            "duration": 100, "sizeBytes": 100, "jobId": "", "log": "",
-        }
-        files = [file_entry("img.png", b"data")]
-        client.compile(r"\doc", engine="xelatex", timeout=30, runs=2, files=files)
-
-        _, body = client._http.post_json.call_args[0]
-        assert body["engine"] == "xelatex"
-        assert body["timeout"] == 30
-        assert body["runs"] == 2
-        assert body["files"] == files
+    def test_pdf_is_decoded_lazily_once(self, client):
+        client._http.post_json.return_value = {"pdf": FAKE_PDF_B64, "sizeBytes": len(FAKE_PDF)}
+        with patch("formatex.client._b64decode", wraps=base64.b64decode) as mock_decode:
+            result = client.compile(r"\doc")
+            assert result.size_bytes == len(FAKE_PDF)
+            mock_decode.assert_not_called()
+            assert result.pdf == FAKE_PDF
+            assert result.pdf == FAKE_PDF
+        mock_decode.assert_called_once()
+
+    def test_lazy_result_equals_eager_one(self):
+        lazy = CompileResult(pdf=FAKE_PDF_B64, engine="pdflatex", duration_ms=1, size_bytes=0, job_id="")
+        eager = CompileResult(pdf=FAKE_PDF, engine="pdflatex", duration_ms=1, size_bytes=0, job_id="")
+        assert lazy == eager
+        assert repr(lazy) == repr(eager)
 
     def test_missing_optional_fields_default(self, client):
         client._http.post_json.return_value = {"pdf": FAKE_PDF_B64}
@@ -151,13 +312,52 @@ class TestCompile:
         assert result.duration_ms == 0
         assert result.analysis is None
 
-    def test_omits_optional_body_keys_when_none(self, client):
-        client._http.post_json.return_value = {"pdf": FAKE_PDF_B64}
-        client.compile(r"\doc")
-        _, body = client._http.post_json.call_args[0]
-        assert "timeout" not in body
-        assert "runs" not in body
-        assert "files" not in body
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            ({}, {"latex": r"\doc", "engine": "pdflatex"}),
+            (
+                {"engine": "xelatex", "timeout": 30, "runs": 2, "files": [IMG_ENTRY]},
+                {"latex": r"\doc", "engine": "xelatex", "timeout": 30, "runs": 2, "files": [IMG_ENTRY]},
+            ),
+        ],
+        ids=["defaults-omit-optional-keys", "engine-and-optional-params"],
+    )
+    def test_request_body(self, client, kwargs, expected):
+        client._http.post_json.return_value = dict(COMPILE_OK)
+        client.compile(r"\doc", **kwargs)
+        assert client._http.post_json.call_args == call("/api/v1/compile", expected)
+
+
+# ── compile_binary ────────────────────────────────────────────────────────────
+
+
+class TestCompileBinary:
+    def test_uses_raw_pdf_from_binary_response(self, client):
+        client._http.post_pdf.return_value = (
+            FAKE_PDF,
+            {"engine": "xelatex", "duration": 210, "jobId": "job-b", "sizeBytes": len(FAKE_PDF)},
+        )
+        result = client.compile_binary(r"\doc", engine="xelatex")
+        assert result.pdf == FAKE_PDF
+        assert result.engine == "xelatex"
+        assert result.duration_ms == 210
+        assert result.job_id == "job-b"
+        assert result.size_bytes == len(FAKE_PDF)
+
+    def test_falls_back_to_json_payload(self, client):
+        client._http.post_pdf.return_value = (None, {"pdf": FAKE_PDF_B64, "log": "ok"})
+        result = client.compile_binary(r"\doc")
+        assert result.pdf == FAKE_PDF
+        assert result.engine == "pdflatex"
+        assert result.log == "ok"
+
+    def test_calls_compile_endpoint(self, client):
+        client._http.post_pdf.return_value = (FAKE_PDF, {})
+        client.compile_binary(r"\doc", runs=2)
+        path, body = client._http.post_pdf.call_args.args
+        assert path == "/api/v1/compile"
+        assert body["runs"] == 2
 
 
 # ── compile_smart ─────────────────────────────────────────────────────────────
@@ -166,12 +366,8 @@ class TestCompile:
 class TestCompileSmart:
     def test_returns_analysis(self, client):
         client._http.post_json.return_value = {
-            "pdf": FAKE_PDF_B64,
+            **COMPILE_OK,
             "engine": "xelatex",
-            "duration": 500,
-            "sizeBytes": 200,
-            "jobId": "j2",
-            "log": "",
             "analysis": {"detected": "xelatex", "reason": "fontspec"},
         }
         result = client.compile_smart(r"\doc")
@@ -179,31 +375,69 @@ class TestCompileSmart:
         assert result.analysis == {"detected": "xelatex", "reason": "fontspec"}
 
     def test_sends_engine_auto(self, client):
-        client._http.post_json.return_value = {"pdf": FAKE_PDF_B64}
+        client._http.post_json.return_value = dict(COMPILE_OK)
         client.compile_smart(r"\doc")
-        _, body = client._http.post_json.call_args[0]
+        body = client._http.post_json.body
         assert body["engine"] == "auto"
 
+    def test_reuse_engine_skips_detection_for_same_preamble(self, client):
+        client._http.post_json.return_value = {**COMPILE_OK, "engine": "xelatex"}
+        preamble = r"\documentclass{article}\usepackage{fontspec}"
+        client.compile_smart(preamble + r"\begin{document}A\end{document}", reuse_engine=True)
+        result = client.compile_smart(preamble + r"\begin{document}B\end{document}", reuse_engine=True)
+
+        paths = [c[0][0] for c in client._http.post_json.call_args_list]
+        assert paths == ["/api/v1/compile/smart", "/api/v1/compile"]
+        assert client._http.post_json.body["engine"] == "xelatex"
+        assert result.analysis is None
+
+    def test_reuse_engine_detects_new_preamble(self, client):
+        client._http.post_json.return_value = {**COMPILE_OK, "engine": "xelatex"}
+        client.compile_smart(r"\documentclass{article}\begin{document}\end{document}", reuse_engine=True)
+        client.compile_smart(r"\documentclass{book}\begin{document}\end{document}", reuse_engine=True)
+        paths = [c[0][0] for c in client._http.post_json.call_args_list]
+        assert paths == ["/api/v1/compile/smart", "/api/v1/compile/smart"]
+
 
 # ── compile_to_file ───────────────────────────────────────────────────────────
 
 
+def _stream_pdf(path, body, dest):
+    """Stand-in for HTTPClient.post_stream_to serving a binary PDF response."""
+    dest.write_bytes(FAKE_PDF)
+    return len(FAKE_PDF), {"engine": body["engine"], "duration": 100, "sizeBytes": len(FAKE_PDF)}
+
+
 class TestCompileToFile:
-    def test_writes_pdf_to_path(self, client, tmp_path):
-        client._http.post_json.return_value = {
-            "pdf": FAKE_PDF_B64, "engine": "pdflatex",
-            "duration": 100, "sizeBytes": len(FAKE_PDF), "jobId": "", "log": "",
-        }
-        out = tmp_path / "output.pdf"
-        client.compile_to_file(r"\doc", out)
+    def test_streams_pdf_to_path(self, client, out_dir):
+        client._http.post_stream_to.side_effect = _stream_pdf
+        out = out_dir / "streamed.pdf"
+        result = client.compile_to_file(r"\doc", out)
+
+        assert out.read_bytes() == FAKE_PDF
+        assert result.pdf == b""
+        assert result.size_bytes == len(FAKE_PDF)
+        assert result.duration_ms == 100
+        path, body, dest = client._http.post_stream_to.call_args.args
+        assert path == "/api/v1/compile"
+        assert dest == out
+
+    def test_writes_decoded_pdf_on_json_fallback(self, client, out_dir):
+        client._http.post_stream_to.return_value = (None, {"pdf": FAKE_PDF_B64, "log": "ok"})
+        out = out_dir / "fallback.pdf"
+        result = client.compile_to_file(r"\doc", str(out))
         assert out.read_bytes() == FAKE_PDF
+        assert result.pdf == FAKE_PDF
+        assert result.log == "ok"
 
-    def test_uses_compile_smart_when_smart_true(self, client, tmp_path):
-        client._http.post_json.return_value = {"pdf": FAKE_PDF_B64}
-        out = tmp_path / "out.pdf"
-        client.compile_to_file(r"\doc", out, smart=True)
-        path, _ = client._http.post_json.call_args[0]
+    def test_uses_compile_smart_when_smart_true(self, client, out_dir):
+        client._http.post_stream_to.side_effect = _stream_pdf
+        result = client.compile_to_file(r"\doc", out_dir / "smart.pdf", smart=True, timeout=30)
+        path, body, _ = client._http.post_stream_to.call_args.args
         assert "smart" in path
+        assert body["engine"] == "auto"
+        assert body["timeout"] == 30
+        assert result.engine == "auto"
 
 
 # ── async_compile ─────────────────────────────────────────────────────────────
@@ -211,29 +445,62 @@ class TestCompileToFile:
 
 class TestAsyncCompile:
     def test_returns_async_job(self, client):
-        client._http.post_json.return_value = {"jobId": "async-1", "status": "pending"}
+        client._http.post_json.return_value = dict(JOB_PENDING)
         job = client.async_compile(r"\doc", engine="lualatex")
         assert isinstance(job, AsyncJob)
         assert job.job_id == "async-1"
         assert job.status == "pending"
 
     def test_sends_correct_body(self, client):
-        client._http.post_json.return_value = {"jobId": "x", "status": "pending"}
+        client._http.post_json.return_value = dict(JOB_PENDING)
         client.async_compile(r"\doc", engine="xelatex", timeout=60, runs=3)
-        _, body = client._http.post_json.call_args[0]
+        body = client._http.post_json.body
         assert body["engine"] == "xelatex"
         assert body["timeout"] == 60
         assert body["runs"] == 3
 
+    def test_many_jobs_in_one_request(self, client):
+        client._http.post_json.return_value = {
+            "jobs": [{"jobId": "a", "status": "pending"}, {"jobId": "b", "status": "queued"}]
+        }
+        jobs = client.async_compile_many([{"latex": r"\a"}, {"latex": r"\b", "engine": "xelatex", "runs": 2}])
+
+        assert jobs == [AsyncJob(job_id="a", status="pending"), AsyncJob(job_id="b", status="queued")]
+        client._http.post_json.assert_called_once_with(
+            "/api/v1/compile/async/batch",
+            {"jobs": [
+                {"latex": r"\a", "engine": "pdflatex"},
+                {"latex": r"\b", "engine": "xelatex", "runs": 2},
+            ]},
+        )
+
+    def test_many_falls_back_to_single_submissions_on_404(self, client):
+        client._http.post_json.side_effect = [
+            FormaTexError("not found", status_code=404),
+            {"jobId": "a", "status": "pending"},
+            {"jobId": "b", "status": "pending"},
+        ]
+        jobs = client.async_compile_many([{"latex": r"\a"}, {"latex": r"\b"}])
+
+        assert [j.job_id for j in jobs] == ["a", "b"]
+        assert client._http.post_json.call_args_list[1][0][0] == "/api/v1/compile/async"
+
+    def test_many_propagates_other_errors(self, client):
+        client._http.post_json.side_effect = RateLimitError("slow down", status_code=429)
+        with pytest.raises(RateLimitError):
+            client.async_compile_many([{"latex": r"\a"}])
+
+    def test_many_empty_makes_no_request(self, client):
+        assert client.async_compile_many([]) == []
+        client._http.post_json.assert_not_called()
+
 
 # ── get_job ───────────────────────────────────────────────────────────────────
 
 
 class TestGetJob:
     def test_pending_status(self, client):
-        client._http.get_json.return_value = {
-            "id": "j1", "status": "processing", "result": None
-        }
+        client._http.get_json.return_value = dict(JOB_PROCESSING)
         job = client.get_job("j1")
         assert isinstance(job, JobResult)
         assert job.status == "processing"
@@ -252,11 +519,38 @@ class TestGetJob:
         assert job.log == "Done."
         assert job.duration_ms == 450
 
-    def test_calls_correct_endpoint(self, client):
-        client._http.get_json.return_value = {"id": "j1", "status": "pending"}
-        client.get_job("j1")
-        path = client._http.get_json.call_args[0][0]
-        assert path == "/api/v1/jobs/j1"
+
+class TestGetJobs:
+    def test_one_request_for_all_jobs(self, client):
+        client._http.get_json.return_value = {"jobs": [
+            {"id": "b", "status": "completed", "result": {"success": True}},
+            {"id": "a", "status": "processing"},
+        ]}
+        jobs = client.get_jobs(["a", "b"])
+
+        assert [(j.job_id, j.status) for j in jobs] == [("a", "processing"), ("b", "completed")]
+        assert jobs[1].success is True
+        client._http.get_json.assert_called_once_with("/api/v1/jobs?ids=a,b")
+
+    def test_missing_job_reports_unknown(self, client):
+        client._http.get_json.return_value = {"jobs": []}
+        [job] = client.get_jobs(["gone"])
+        assert (job.job_id, job.status) == ("gone", "unknown")
+
+    def test_falls_back_to_single_polls_on_404(self, client):
+        client._http.get_json.side_effect = [
+            FormaTexError("not found", status_code=404),
+            dict(JOB_PROCESSING, id="a"),
+            dict(JOB_PROCESSING, id="b"),
+        ]
+        jobs = client.get_jobs(["a", "b"])
+
+        assert [j.job_id for j in jobs] == ["a", "b"]
+        assert client._http.get_json.call_args_list[1][0][0] == "/api/v1/jobs/a"
+
+    def test_empty_makes_no_request(self, client):
+        assert client.get_jobs([]) == []
+        client._http.get_json.assert_not_called()
 
 
 # ── get_job_pdf ───────────────────────────────────────────────────────────────
@@ -301,22 +595,60 @@ class TestDeleteJob:
 # ── wait_for_job ──────────────────────────────────────────────────────────────
 
 
+class FakeClock:
+    """Stand-in for ``formatex.client.time``: ``monotonic()`` returns ``now``
+    and ``sleep()`` only records the requested delay."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
 class TestWaitForJob:
-    def test_polls_then_returns_on_completion(self, client):
+    @pytest.fixture(autouse=True)
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr("formatex.client.time", clock)
+        return clock
+
+    def _respond(self, clock, responses, *, advance=0.0):
+        """get_json side effect serving ``responses``, each taking ``advance`` seconds."""
+        queue = iter(responses)
+
+        def get_json(path, **kwargs):
+            clock.now += advance
+            return next(queue)
+
+        return get_json
+
+    def test_polls_then_returns_on_completion(self, client, clock):
         client._http.get_json.side_effect = [
-            {"id": "j1", "status": "processing", "result": None},
+            dict(JOB_PROCESSING),
             {"id": "j1", "status": "completed", "result": {"log": "OK", "duration": 800}},
         ]
         client._http.get_bytes.return_value = FAKE_PDF
 
-        with patch("formatex.client.time.sleep") as mock_sleep:
-            with patch("formatex.client.time.monotonic", return_value=0.0):
-                result = client.wait_for_job("j1", timeout=60.0, poll_interval=2.0)
+        result = client.wait_for_job("j1", timeout=60.0, poll_interval=2.0)
 
         assert result.pdf == FAKE_PDF
         assert result.duration_ms == 800
         assert result.log == "OK"
-        mock_sleep.assert_called_once_with(2.0)
+        assert clock.sleeps == [2.0]
+
+    def test_leaves_pdf_on_server_when_not_downloading(self, client):
+        client._http.get_json.return_value = {"id": "j1", "status": "completed", "result": {"log": "OK"}}
+
+        result = client.wait_for_job("j1", download_pdf=False)
+
+        assert result.pdf == b""
+        assert result.log == "OK"
+        client._http.get_bytes.assert_not_called()
 
     def test_raises_compilation_error_on_failure(self, client):
         client._http.get_json.return_value = {
@@ -325,23 +657,58 @@ class TestWaitForJob:
             "result": {"error": "Undefined control sequence", "log": "! error log"},
         }
 
-        with patch("formatex.client.time.sleep"):
-            with patch("formatex.client.time.monotonic", return_value=0.0):
-                with pytest.raises(CompilationError) as exc_info:
-                    client.wait_for_job("j1")
+        with pytest.raises(CompilationError) as exc_info:
+            client.wait_for_job("j1")
 
         assert "Undefined control sequence" in str(exc_info.value)
         assert "error log" in exc_info.value.log
 
-    def test_raises_FormaTex_error_on_timeout(self, client):
-        client._http.get_json.return_value = {
-            "id": "j1", "status": "processing", "result": None
-        }
-        # monotonic: first call sets deadline=10.0, second call returns 999 (expired)
-        with patch("formatex.client.time.monotonic", side_effect=[0.0, 999.0]):
-            with patch("formatex.client.time.sleep"):
-                with pytest.raises(FormaTexError, match="did not complete within 10"):
-                    client.wait_for_job("j1", timeout=10.0)
+    def test_backs_off_when_server_answers_immediately(self, client, clock):
+        client._http.get_json.side_effect = [
+            {"id": "j1", "status": "processing"} for _ in range(5)
+        ] + [{"id": "j1", "status": "completed", "result": {}}]
+        client._http.get_bytes.return_value = FAKE_PDF
+
+        client.wait_for_job("j1", poll_interval=2.0)
+
+        assert clock.sleeps == [2.0, 3.0, 4.5, 5.0, 5.0]
+
+    def test_slow_reply_is_not_mistaken_for_long_poll(self, client, clock):
+        # The server ignores ?wait= but takes 1.5 s per reply.
+        client._http.get_json.side_effect = self._respond(
+            clock,
+            [dict(JOB_PROCESSING)] * 3 + [{"id": "j1", "status": "completed", "result": {}}],
+            advance=1.5,
+        )
+        client._http.get_bytes.return_value = FAKE_PDF
+
+        client.wait_for_job("j1", poll_interval=2.0, timeout=300.0)
+
+        assert clock.sleeps == [2.0, 3.0, 4.5]
+
+    def test_long_polls_without_sleeping(self, client, clock):
+        # The server holds each request for 30 s.
+        client._http.get_json.side_effect = self._respond(
+            clock,
+            [{"id": "j1", "status": "processing"}, {"id": "j1", "status": "completed", "result": {}}],
+            advance=30.0,
+        )
+        client._http.get_bytes.return_value = FAKE_PDF
+
+        client.wait_for_job("j1", timeout=300.0)
+
+        assert clock.sleeps == []
+        assert client._http.get_json.call_args_list == [
+            call("/api/v1/jobs/j1", wait=30),
+            call("/api/v1/jobs/j1", wait=30),
+        ]
+
+    def test_raises_FormaTex_error_on_timeout(self, client, clock):
+        client._http.get_json.side_effect = self._respond(clock, [dict(JOB_PROCESSING)], advance=999.0)
+
+        with pytest.raises(FormaTexError) as exc_info:
+            client.wait_for_job("j1", timeout=10.0)
+        assert "did not complete within 10" in str(exc_info.value)
 
 
 # ── check_syntax ──────────────────────────────────────────────────────────────
@@ -349,7 +716,7 @@ class TestWaitForJob:
 
 class TestCheckSyntax:
     def test_valid_document(self, client):
-        client._http.post_json.return_value = {"valid": True, "errors": [], "warnings": []}
+        client._http.post_json.return_value = dict(SYNTAX_OK)
         result = client.check_syntax(r"\documentclass{article}\begin{document}\end{document}")
         assert isinstance(result, SyntaxResult)
         assert result.valid is True
@@ -365,11 +732,119 @@ class TestCheckSyntax:
         assert result.valid is False
         assert len(result.errors) == 1
 
-    def test_calls_correct_endpoint(self, client):
-        client._http.post_json.return_value = {"valid": True, "errors": [], "warnings": []}
-        client.check_syntax(r"\doc")
-        path, _ = client._http.post_json.call_args[0]
-        assert path == "/api/v1/compile/check"
+    @pytest.mark.parametrize(
+        "latex",
+        ["", "  \n", r"\begin{document}", r"\begin{itemize}\end{itemize}\end{document}"],
+    )
+    def test_local_fastpath_rejects_trivially_broken_input(self, client, latex):
+        result = client.check_syntax(latex, local_fastpath=True)
+        assert result.valid is False
+        assert result.errors[0]["source"] == "local"
+        client._http.post_json.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "latex",
+        [
+            "\\begin{document}\n% \\begin{table} commented out\n50\\% \\end{document}",
+            "line\\\\% \\begin{table}",
+            r"\begin{verbatim}\begin{itemize}\end{verbatim}",
+            r"\verb|\end{itemize}| and \verb*+\begin{x}+",
+            r"\newcommand{\bi}{\begin{itemize}}\bi \item x \end{itemize}\end{document}",
+        ],
+    )
+    def test_local_fastpath_defers_to_server(self, client, latex):
+        client._http.post_json.return_value = dict(SYNTAX_OK)
+        assert client.check_syntax(latex, local_fastpath=True).valid is True
+        client._http.post_json.assert_called_once()
+
+    def test_local_fastpath_still_sees_environments_after_line_break(self, client):
+        result = client.check_syntax("a\\\\\\begin{table}", local_fastpath=True)
+        assert result.errors[0]["source"] == "local"
+
+    def test_empty_input_sent_without_fastpath(self, client):
+        client._http.post_json.return_value = {"valid": False, "errors": [], "warnings": []}
+        client.check_syntax("")
+        client._http.post_json.assert_called_once()
+
+
+# ── check_syntax_batch ────────────────────────────────────────────────────────
+
+
+class TestCheckSyntaxBatch:
+    def test_one_request_for_all_documents(self, client):
+        client._http.post_json.return_value = {
+            "results": [
+                {"valid": True, "errors": [], "warnings": []},
+                {"valid": False, "errors": [{"message": "x"}], "warnings": []},
+            ]
+        }
+        results = client.check_syntax_batch([r"\a", r"\b"])
+
+        assert [r.valid for r in results] == [True, False]
+        client._http.post_json.assert_called_once_with(
+            "/api/v1/compile/check/batch", {"documents": [r"\a", r"\b"]}
+        )
+
+    def test_short_response_raises(self, client):
+        client._http.post_json.return_value = {"results": [{"valid": True}]}
+        with pytest.raises(FormaTexError, match="1 results for 2 documents"):
+            client.check_syntax_batch([r"\a", r"\b"])
+
+    def test_empty_input_skips_request(self, client):
+        assert client.check_syntax_batch([]) == []
+        client._http.post_json.assert_not_called()
+
+
+class TestSyntaxCheckBatcher:
+    def test_coalesces_submissions_into_one_batch(self, client):
+        client._http.post_json.return_value = {
+            "results": [{"valid": True}, {"valid": False}, {"valid": True}]
+        }
+        with SyntaxCheckBatcher(client, window=60.0) as batcher:
+            futures = [batcher.submit(src) for src in ("a", "b", "c")]
+
+        assert [f.result().valid for f in futures] == [True, False, True]
+        client._http.post_json.assert_called_once()
+
+    def test_flushes_when_batch_is_full(self, client):
+        client._http.post_json.return_value = {"results": [{"valid": True}] * 2}
+        batcher = SyntaxCheckBatcher(client, window=60.0, max_batch=2)
+        first = batcher.submit("a")
+        second = batcher.submit("b")
+        assert first.done() and second.done()
+
+    def test_window_timer_flushes(self, client):
+        client._http.post_json.return_value = {"results": [{"valid": True}]}
+        batcher = SyntaxCheckBatcher(client, window=0.01)
+        assert batcher.check_syntax("a").valid is True
+
+    def test_errors_propagate_to_every_future(self, client):
+        client._http.post_json.side_effect = AuthenticationError("bad key", status_code=401)
+        with SyntaxCheckBatcher(client, window=60.0) as batcher:
+            futures = [batcher.submit("a"), batcher.submit("b")]
+        for f in futures:
+            with pytest.raises(AuthenticationError):
+                f.result()
+
+
+    def test_short_response_fails_callers_instead_of_hanging(self, client):
+        client._http.post_json.return_value = {"results": []}
+        with SyntaxCheckBatcher(client, window=60.0) as batcher:
+            futures = [batcher.submit("a"), batcher.submit("b")]
+        for f in futures:
+            with pytest.raises(FormaTexError):
+                f.result(timeout=1)
+
+    def test_unmatched_futures_fail_even_if_client_returns_short_list(self):
+        class ShortClient:
+            def check_syntax_batch(self, latexes):
+                return [SyntaxResult(valid=True, errors=[], warnings=[])]
+
+        with SyntaxCheckBatcher(ShortClient(), window=60.0) as batcher:
+            first, second = batcher.submit("a"), batcher.submit("b")
+        assert first.result(timeout=1).valid is True
+        with pytest.raises(FormaTexError, match="no result for 1 of 2"):
+            second.result(timeout=1)
 
 
 # ── lint ─────────────────────────────────────────────────────────────────────
@@ -411,12 +886,6 @@ class TestLint:
         result = client.lint(r"\doc")
         assert result.diagnostics == []
 
-    def test_calls_correct_endpoint(self, client):
-        client._http.post_json.return_value = {"diagnostics": [], "duration": 5}
-        client.lint(r"\doc")
-        path, _ = client._http.post_json.call_args[0]
-        assert path == "/api/v1/lint"
-
 
 # ── convert ───────────────────────────────────────────────────────────────────
 
@@ -436,26 +905,20 @@ class TestConvert:
         client._http.post_bytes.return_value = FAKE_DOCX
         files = [file_entry("img.png", b"png")]
         client.convert(r"\doc", files=files)
-        _, body = client._http.post_bytes.call_args[0]
+        body = client._http.post_bytes.body
         assert body["files"] == files
 
     def test_omits_files_key_when_none(self, client):
         client._http.post_bytes.return_value = FAKE_DOCX
         client.convert(r"\doc")
-        _, body = client._http.post_bytes.call_args[0]
+        body = client._http.post_bytes.body
         assert "files" not in body
 
-    def test_calls_correct_endpoint(self, client):
-        client._http.post_bytes.return_value = FAKE_DOCX
-        client.convert(r"\doc")
-        path, _ = client._http.post_bytes.call_args[0]
-        assert path == "/api/v1/convert"
-
 
 class TestConvertToFile:
-    def test_writes_docx_to_path(self, client, tmp_path):
+    def test_writes_docx_to_path(self, client, out_dir):
         client._http.post_bytes.return_value = FAKE_DOCX
-        out = tmp_path / "doc.docx"
+        out = out_dir / "doc.docx"
         result = client.convert_to_file(r"\doc", out)
         assert out.read_bytes() == FAKE_DOCX
         assert result.docx == FAKE_DOCX
@@ -520,16 +983,171 @@ class TestListEngines:
         assert client.list_engines() == []
 
 
+# ── response cache ────────────────────────────────────────────────────────────
+
+
+class TestResponseCache:
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(ttl=10.0)
+        with patch("formatex._cache.time.monotonic", return_value=0.0):
+            cache.set("k", "v")
+        with patch("formatex._cache.time.monotonic", return_value=5.0):
+            assert cache.get("k") == "v"
+        with patch("formatex._cache.time.monotonic", return_value=10.0):
+            assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestClientCache:
+    @pytest.fixture
+    def cached_client(self):
+        c = FormaTexClient("fx_test_key_abc", cache=True)
+        c._http = HTTPStub()
+        return c
+
+    def test_disabled_by_default(self, client):
+        client._http.get_json.return_value = {"engines": []}
+        client.list_engines()
+        client.list_engines()
+        assert client._http.get_json.call_count == 2
+
+    def test_check_syntax_memoized_per_source(self, cached_client):
+        cached_client._http.post_json.return_value = dict(SYNTAX_OK)
+        first = cached_client.check_syntax(r"\doc")
+        assert cached_client.check_syntax(r"\doc") == first
+        cached_client.check_syntax(r"\other")
+        assert cached_client._http.post_json.call_count == 2
+
+    def test_engines_and_usage_memoized(self, cached_client):
+        cached_client._http.get_json.side_effect = [
+            {"engines": [{"name": "pdflatex"}]},
+            {"plan": "pro"},
+        ]
+        for _ in range(3):
+            cached_client.list_engines()
+            cached_client.get_usage()
+        assert cached_client._http.get_json.call_count == 2
+
+    def test_clear_cache_forces_refetch(self, cached_client):
+        cached_client._http.get_json.return_value = {"engines": []}
+        cached_client.list_engines()
+        cached_client.clear_cache()
+        cached_client.list_engines()
+        assert cached_client._http.get_json.call_count == 2
+
+    def test_accepts_shared_cache_instance(self):
+        shared = ResponseCache(maxsize=8, ttl=5.0)
+        a = FormaTexClient("fx_a", cache=shared)
+        b = FormaTexClient("fx_b", cache=shared)
+        assert a._cache is b._cache is shared
+
+    def test_shared_cache_keeps_accounts_apart(self):
+        shared = ResponseCache(maxsize=8, ttl=5.0)
+        a = FormaTexClient("fx_a", cache=shared)
+        b = FormaTexClient("fx_b", cache=shared)
+        a._http, b._http = HTTPStub(), HTTPStub()
+        a._http.get_json.return_value = {"plan": "pro"}
+        b._http.get_json.return_value = {"plan": "free"}
+        assert a.get_usage().plan == "pro"
+        assert b.get_usage().plan == "free"
+        assert b._http.get_json.call_count == 1
+
+    def test_mutating_a_result_does_not_poison_the_cache(self, cached_client):
+        cached_client._http.get_json.return_value = {"engines": [{"name": "pdflatex"}]}
+        cached_client.list_engines().clear()
+        cached_client.list_engines()[0]["name"] = "xelatex"
+        assert cached_client.list_engines() == [{"name": "pdflatex"}]
+        assert cached_client._http.get_json.call_count == 1
+
+
+# ── endpoint routing ──────────────────────────────────────────────────────────
+
+# One JSON payload every JSON endpoint can parse.
+ANY_JSON = MappingProxyType({**COMPILE_OK, **SYNTAX_OK, "id": "j1", "diagnostics": []})
+
+
+class TestEndpoints:
+    @pytest.mark.parametrize(
+        "method, arg, attr, path",
+        [
+            ("compile", r"\doc", "post_json", "/api/v1/compile"),
+            ("compile_smart", r"\doc", "post_json", "/api/v1/compile/smart"),
+            ("async_compile", r"\doc", "post_json", "/api/v1/compile/async"),
+            ("check_syntax", r"\doc", "post_json", "/api/v1/compile/check"),
+            ("lint", r"\doc", "post_json", "/api/v1/lint"),
+            ("convert", r"\doc", "post_bytes", "/api/v1/convert"),
+            ("get_job", "j1", "get_json", "/api/v1/jobs/j1"),
+            ("get_job_log", "j1", "get_json", "/api/v1/jobs/j1/log"),
+            ("get_job_pdf", "j1", "get_bytes", "/api/v1/jobs/j1/pdf"),
+            ("delete_job", "j1", "delete_json", "/api/v1/jobs/j1"),
+        ],
+    )
+    def test_calls_correct_endpoint(self, client, method, arg, attr, path):
+        stub = getattr(client._http, attr)
+        stub.return_value = FAKE_DOCX if attr in ("post_bytes", "get_bytes") else dict(ANY_JSON)
+        getattr(client, method)(arg)
+        assert stub.call_args.args[0] == path
+
+
 # ── context manager ───────────────────────────────────────────────────────────
 
 
 class TestContextManager:
     def test_close_called_on_exit(self):
         with FormaTexClient("fx_key") as c:
-            c._http = MagicMock()
+            c._http = HTTPStub()
         c._http.close.assert_called_once()
 
 
+class TestPrewarm:
+    def test_prewarm_opens_connection_in_background(self):
+        with patch("formatex.client.HTTPClient") as mock_http:
+            c = FormaTexClient("fx_key", prewarm=True)
+            c.close()
+        mock_http.return_value.get_json.assert_called_once_with("/api/v1/engines", conditional=True)
+
+    def test_prewarm_failure_is_swallowed(self):
+        with patch("formatex.client.HTTPClient") as mock_http:
+            mock_http.return_value.get_json.side_effect = httpx.ConnectError("offline")
+            c = FormaTexClient("fx_key", prewarm=True)
+            c.close()
+        mock_http.return_value.close.assert_called_once()
+
+    def test_no_request_by_default(self):
+        with patch("formatex.client.HTTPClient") as mock_http:
+            FormaTexClient("fx_key").close()
+        mock_http.return_value.get_json.assert_not_called()
+
+
+class TestConnectionOptions:
+    def test_limits_reach_http_layer(self):
+        limits = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300)
+        with patch("formatex.client.HTTPClient") as mock_http:
+            FormaTexClient("fx_key", limits=limits)
+        assert mock_http.call_args.kwargs["limits"] is limits
+
+    def test_base_url_is_not_a_constructor_option(self):
+        with pytest.raises(TypeError):
+            FormaTexClient("fx_key", base_url="https://staging.test")
+
+    def test_defaults(self):
+        with patch("formatex.client.HTTPClient") as mock_http:
+            FormaTexClient("fx_key")
+        kwargs = mock_http.call_args.kwargs
+        assert kwargs["base_url"] == DEFAULT_BASE_URL
+        assert kwargs["limits"] is None
+
+
 # ── exception hierarchy ───────────────────────────────────────────────────────
 
 
@@ -548,6 +1166,39 @@ class TestExceptions:
         err = RateLimitError("too many requests", retry_after=30.5)
         assert err.retry_after == 30.5
 
+    def test_formatex_spelling_aliases(self):
+        import formatex
+
+        assert formatex.FormatExClient is FormaTexClient
+        assert formatex.FormatExError is FormaTexError
+        from formatex.exceptions import FormatExError
+
+        assert FormatExError is FormaTexError
+        with pytest.raises(AttributeError):
+            formatex.NoSuchThing
+
+    def test_import_is_lazy(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, formatex; "
+            "assert 'httpx' not in sys.modules and 'formatex.client' not in sys.modules; "
+            "formatex.FormaTexError; "
+            "assert 'httpx' not in sys.modules; "
+            "formatex.FormaTexClient; "
+            "assert 'formatex.client' in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_star_import_exposes_all(self):
+        import formatex
+
+        namespace: dict = {}
+        exec("from formatex import *", namespace)
+        assert set(formatex.__all__) <= set(namespace)
+        assert "FormaTexClient" in dir(formatex)
+
     def test_FormaTex_error_status_code(self):
         err = FormaTexError("oops", status_code=500)
         assert err.status_code == 500
@@ -14,6 +14,11 @@ Set the base URL then run with the `e2e` marker:
     $env:FORMATEX_E2E_BASE_URL = "https://api-test.formatex.zedmed.online"
     pytest tests/test_e2e.py -v -m e2e
 
+Most of the run is spent waiting on the server, so it parallelizes well
+with pytest-xdist (one account is still shared by all workers):
+
+    pytest tests/test_e2e.py -m e2e -n 4 --dist loadgroup
+
 If FORMATEX_E2E_BASE_URL is not set the entire module is skipped automatically.
 
 Note: These tests create a real user, make real compilations, and consume quota.
@@ -23,10 +28,10 @@ Note: These tests create a real user, make real compilations, and consume quota.
 from __future__ import annotations
 
 import os
-import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
-import httpx
 import pytest
 
 from formatex import (
@@ -79,89 +84,37 @@ Hello
 \end{document}
 """.strip()
 
-# ── Session-scoped setup: register → login → get API key ─────────────────────
-
-
-@pytest.fixture(scope="session")
-def api_key() -> str:
-    """
-    Full bootstrap fixture:
-      - Registers a unique test user
-      - Logs in to get a JWT
-      - Creates an API key
-      - Yields the raw API key string
-      - Deletes the test user on teardown
-    """
-    run_id = uuid.uuid4().hex[:8]
-    email = f"sdk-e2e-{run_id}@test.FormaTex.internal"
-    password = f"E2eTest-{run_id}!"
-    name = f"SDK E2E {run_id}"
-
-    with httpx.Client(base_url=BASE_URL, timeout=30) as http:
-        # 1. Register
-        resp = http.post("/api/v1/auth/register", json={"name": name, "email": email, "password": password})
-        assert resp.status_code == 201, f"Register failed {resp.status_code}: {resp.text}"
-        user_id = resp.json()["user"]["id"]
-
-        # 2. Login
-        resp = http.post("/api/v1/auth/login", json={"email": email, "password": password})
-        assert resp.status_code == 200, f"Login failed {resp.status_code}: {resp.text}"
-        jwt_token = resp.json()["token"]
-
-        # 3. Create API key (JWT-authenticated)
-        resp = http.post(
-            "/api/v1/users/me/api-keys",
-            json={"name": "sdk-e2e-key"},
-            headers={"Authorization": f"Bearer {jwt_token}"},
-        )
-        assert resp.status_code == 201, f"API key creation failed {resp.status_code}: {resp.text}"
-        raw_key = resp.json()["key"]
-        assert len(raw_key) >= 8, f"API key too short: {raw_key!r}"
-
-    yield raw_key
-
-    # Teardown: delete the test user (requires admin or self-delete endpoint)
-    # Try self-delete first; if the API doesn't support it, leave the user
-    # (test users on a staging environment are harmless and quota-free)
-    try:
-        with httpx.Client(base_url=BASE_URL, timeout=15) as http:
-            resp = http.post("/api/v1/auth/login", json={"email": email, "password": password})
-            if resp.status_code == 200:
-                token = resp.json()["token"]
-                http.delete("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
-    except Exception:
-        pass  # teardown is best-effort
-
-
-@pytest.fixture(scope="session")
-def client(api_key: str) -> FormaTexClient:
-    """Shared FormaTexClient for the e2e session."""
-    c = FormaTexClient(api_key, base_url=BASE_URL)
-    yield c
-    c.close()
+@pytest.fixture(scope="module")
+def out_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """One output directory for the file-writing tests; each uses its own filename."""
+    return tmp_path_factory.mktemp("outputs")
+
+
+def _magic(path: Path, size: int) -> bytes:
+    """The first ``size`` bytes of a written file (a missing file raises)."""
+    with path.open("rb") as f:
+        return f.read(size)
 
 
 # ── Health check ──────────────────────────────────────────────────────────────
 
 
 class TestHealthCheck:
-    def test_api_is_reachable(self):
-        """Verify the API base URL responds before running any SDK tests."""
-        resp = httpx.get(f"{BASE_URL}/api/v1/health", timeout=10)
-        assert resp.status_code == 200, f"API unreachable: {resp.status_code}"
+    def test_api_is_reachable(self, api_key: str):
+        """The bootstrap checks /api/v1/health before registering; getting a key proves it passed."""
+        assert api_key
 
 
 # ── Engines ───────────────────────────────────────────────────────────────────
 
 
 class TestEngines:
-    def test_list_engines_returns_nonempty(self, client: FormaTexClient):
-        engines = client.list_engines()
-        assert isinstance(engines, list)
-        assert len(engines) > 0
+    def test_list_engines_returns_nonempty(self, engines_list: list):
+        assert isinstance(engines_list, list)
+        assert len(engines_list) > 0
 
-    def test_pdflatex_is_available(self, client: FormaTexClient):
-        engines = client.list_engines()
+    def test_pdflatex_is_available(self, engines_list: list):
+        engines = engines_list
         # API returns list of strings e.g. ["pdflatex", "xelatex", ...]
         names = [e if isinstance(e, str) else e["name"] for e in engines]
         assert "pdflatex" in names
@@ -171,15 +124,15 @@ class TestEngines:
 
 
 class TestUsage:
-    def test_get_usage_returns_stats(self, client: FormaTexClient):
-        usage = client.get_usage()
+    def test_get_usage_returns_stats(self, baseline_usage: UsageStats):
+        usage = baseline_usage
         assert isinstance(usage, UsageStats)
         assert usage.plan != ""
         assert usage.compilations_limit >= 0
         assert usage.compilations_used >= 0
 
-    def test_period_dates_are_set(self, client: FormaTexClient):
-        usage = client.get_usage()
+    def test_period_dates_are_set(self, baseline_usage: UsageStats):
+        usage = baseline_usage
         assert usage.period_start != ""
         assert usage.period_end != ""
 
@@ -188,13 +141,17 @@ class TestUsage:
 
 
 class TestSyntaxCheck:
-    def test_valid_doc_passes(self, client: FormaTexClient):
-        result = client.check_syntax(SIMPLE_DOC)
+    @pytest.fixture(scope="class")
+    def syntax_result(self, client: FormaTexClient) -> SyntaxResult:
+        return client.check_syntax(SIMPLE_DOC)
+
+    def test_valid_doc_passes(self, syntax_result: SyntaxResult):
+        result = syntax_result
         assert isinstance(result, SyntaxResult)
         assert result.valid is True
 
-    def test_schema_fields_present(self, client: FormaTexClient):
-        result = client.check_syntax(SIMPLE_DOC)
+    def test_schema_fields_present(self, syntax_result: SyntaxResult):
+        result = syntax_result
         # errors/warnings may be None when document is valid
         assert result.errors is None or isinstance(result.errors, list)
         assert result.warnings is None or isinstance(result.warnings, list)
@@ -204,57 +161,70 @@ class TestSyntaxCheck:
 
 
 class TestLint:
-    def test_clean_doc_has_no_errors(self, client: FormaTexClient):
-        result = client.lint(SIMPLE_DOC)
+    @pytest.fixture(scope="class")
+    def lint_result(self, client: FormaTexClient) -> LintResult:
+        return client.lint(SIMPLE_DOC)
+
+    def test_clean_doc_has_no_errors(self, lint_result: LintResult):
+        result = lint_result
         assert isinstance(result, LintResult)
         assert result.error_count == 0
         assert result.valid is True
 
-    def test_diagnostics_is_list(self, client: FormaTexClient):
-        result = client.lint(SIMPLE_DOC)
-        assert isinstance(result.diagnostics, list)
+    def test_diagnostics_is_list(self, lint_result: LintResult):
+        assert isinstance(lint_result.diagnostics, list)
 
-    def test_duration_ms_is_positive(self, client: FormaTexClient):
-        result = client.lint(SIMPLE_DOC)
-        assert result.duration_ms >= 0
+    def test_duration_ms_is_positive(self, lint_result: LintResult):
+        assert lint_result.duration_ms >= 0
 
 
 # ── Sync compile ──────────────────────────────────────────────────────────────
 
 
+# The successful-path compiles of TestSyncCompile. They are independent and
+# server-bound, so the class fixture runs them concurrently.
+_SYNC_COMPILES: dict[str, Callable[[FormaTexClient], CompileResult]] = {
+    "simple": lambda c: c.compile(SIMPLE_DOC),
+    "xelatex": lambda c: c.compile(SIMPLE_DOC, engine="xelatex"),
+    "math": lambda c: c.compile(BIB_DOC),
+    "smart": lambda c: c.compile_smart(SIMPLE_DOC),
+}
+
+
+@pytest.fixture(scope="class")
+def compiled(client: FormaTexClient) -> dict[str, Future]:
+    """Futures for every :data:`_SYNC_COMPILES` case, at most 4 in flight at once."""
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return {name: pool.submit(fn, client) for name, fn in _SYNC_COMPILES.items()}
+
+
 class TestSyncCompile:
-    def test_compile_returns_pdf(self, client: FormaTexClient):
-        result = client.compile(SIMPLE_DOC)
+    def test_compile_returns_pdf(self, compiled: dict[str, Future]):
+        result = compiled["simple"].result()
         assert isinstance(result, CompileResult)
         assert result.pdf[:4] == b"%PDF"
         assert result.size_bytes > 0
         assert result.duration_ms > 0
 
-    def test_compile_with_xelatex(self, client: FormaTexClient):
+    def test_compile_with_xelatex(self, compiled: dict[str, Future]):
         try:
-            result = client.compile(SIMPLE_DOC, engine="xelatex")
+            result = compiled["xelatex"].result()
             assert result.pdf[:4] == b"%PDF"
             assert result.engine == "xelatex"
         except PlanLimitError:
             pytest.skip("xelatex not available on this plan")
 
-    def test_compile_with_math(self, client: FormaTexClient):
-        result = client.compile(BIB_DOC)
+    def test_compile_with_math(self, compiled: dict[str, Future]):
+        result = compiled["math"].result()
         assert result.pdf[:4] == b"%PDF"
 
-    def test_broken_latex_raises_compilation_error(self, client: FormaTexClient):
-        with pytest.raises(CompilationError) as exc_info:
-            client.compile(BROKEN_DOC)
-        assert exc_info.value.log != ""  # compiler log is populated
-
-    def test_compile_to_file(self, client: FormaTexClient, tmp_path: Path):
-        out = tmp_path / "output.pdf"
+    def test_compile_to_file(self, client: FormaTexClient, out_dir: Path):
+        out = out_dir / "output.pdf"
         client.compile_to_file(SIMPLE_DOC, out)
-        assert out.exists()
-        assert out.read_bytes()[:4] == b"%PDF"
+        assert _magic(out, 4) == b"%PDF"
 
-    def test_compile_smart(self, client: FormaTexClient):
-        result = client.compile_smart(SIMPLE_DOC)
+    def test_compile_smart(self, compiled: dict[str, Future]):
+        result = compiled["smart"].result()
         assert result.pdf[:4] == b"%PDF"
 
 
@@ -291,6 +261,16 @@ Hello with a companion bib file.
 # ── Async compile ─────────────────────────────────────────────────────────────
 
 
+@pytest.fixture(scope="class")
+def finished_jobs(client: FormaTexClient) -> list[str]:
+    """Two jobs submitted together, then long-polled to completion; their PDFs are NOT downloaded."""
+    job_ids = [client.async_compile(SIMPLE_DOC).job_id for _ in range(2)]
+    for job_id in job_ids:  # both compile at once; the second wait is usually instant
+        client.wait_for_job(job_id, poll_interval=0.5, timeout=120.0, download_pdf=False)
+    return job_ids
+
+
+@pytest.mark.xdist_group("async_compile")
 class TestAsyncCompile:
     def test_submit_returns_job(self, client: FormaTexClient):
         job = client.async_compile(SIMPLE_DOC)
@@ -311,72 +291,62 @@ class TestAsyncCompile:
         assert isinstance(result, CompileResult)
         assert result.pdf[:4] == b"%PDF"
 
-    def test_get_job_log_after_completion(self, client: FormaTexClient):
-        import time
-        job = client.async_compile(SIMPLE_DOC)
-        # Poll manually so we can read the log BEFORE downloading the PDF
+    def test_get_job_log_after_completion(self, client: FormaTexClient, finished_jobs: list[str]):
+        # The log is read BEFORE downloading the PDF
         # (PDF download auto-deletes the job files including the log)
-        deadline = time.monotonic() + 120.0
-        while True:
-            status = client.get_job(job.job_id)
-            if status.status in ("completed", "failed"):
-                break
-            assert time.monotonic() < deadline, "job timed out"
-            time.sleep(2)
-        log = client.get_job_log(job.job_id)
+        log = client.get_job_log(finished_jobs[0])
         assert isinstance(log, str)
 
-    def test_wait_for_job_broken_latex_raises(self, client: FormaTexClient):
-        job = client.async_compile(BROKEN_DOC)
-        with pytest.raises(CompilationError):
-            client.wait_for_job(job.job_id, timeout=120.0)
-
-    def test_delete_job(self, client: FormaTexClient):
-        """Submit a job, wait for complete status, then delete WITHOUT downloading.
+    def test_delete_job(self, client: FormaTexClient, finished_jobs: list[str]):
+        """Delete a finished job WITHOUT downloading it first.
         PDF download auto-deletes the job, so we must delete before downloading.
         """
-        import time
-        job = client.async_compile(SIMPLE_DOC)
-        deadline = time.monotonic() + 120.0
-        while True:
-            status = client.get_job(job.job_id)
-            if status.status in ("completed", "failed"):
-                break
-            assert time.monotonic() < deadline, "job timed out"
-            time.sleep(2)
-        # Delete the job without downloading the PDF first
-        client.delete_job(job.job_id)
+        client.delete_job(finished_jobs[1])
+
+
+# ── Broken documents ──────────────────────────────────────────────────────────
+
+
+class TestBrokenLatex:
+    # Not in the async_compile xdist group: under --dist loadgroup the two
+    # modes (and the 120 s async wait) can run on different workers.
+    @pytest.mark.parametrize("mode", ["sync", "async"])
+    def test_raises_compilation_error(self, client: FormaTexClient, mode: str):
+        with pytest.raises(CompilationError) as exc_info:
+            if mode == "sync":
+                client.compile(BROKEN_DOC)
+            else:
+                job = client.async_compile(BROKEN_DOC)
+                client.wait_for_job(job.job_id, timeout=120.0)
+        if mode == "sync":
+            assert exc_info.value.log != ""  # compiler log is populated
 
 
 # ── Convert to DOCX ───────────────────────────────────────────────────────────
 
 
 class TestConvert:
-    def test_convert_returns_docx(self, client: FormaTexClient):
+    @pytest.fixture(scope="class")
+    def converted(self, client: FormaTexClient) -> ConvertResult:
+        """One conversion for the class; if DOCX is unavailable, every test skips without re-probing."""
         try:
-            result = client.convert(SIMPLE_DOC)
+            return client.convert(SIMPLE_DOC)
         except Exception as exc:
             # pandoc may not be available in all environments
             if "503" in str(exc) or "not available" in str(exc).lower():
                 pytest.skip("DOCX conversion not available in this environment")
             raise
 
-        assert isinstance(result, ConvertResult)
+    def test_convert_returns_docx(self, converted: ConvertResult):
+        assert isinstance(converted, ConvertResult)
         # DOCX files start with PK (ZIP signature)
-        assert result.docx[:2] == b"PK"
-        assert result.size_bytes > 0
-
-    def test_convert_to_file(self, client: FormaTexClient, tmp_path: Path):
-        try:
-            out = tmp_path / "doc.docx"
-            client.convert_to_file(SIMPLE_DOC, out)
-        except Exception as exc:
-            if "503" in str(exc) or "not available" in str(exc).lower():
-                pytest.skip("DOCX conversion not available in this environment")
-            raise
+        assert converted.docx[:2] == b"PK"
+        assert converted.size_bytes > 0
 
-        assert out.exists()
-        assert out.read_bytes()[:2] == b"PK"
+    def test_convert_to_file(self, client: FormaTexClient, converted: ConvertResult, out_dir: Path):
+        out = out_dir / "doc.docx"
+        client.convert_to_file(SIMPLE_DOC, out)
+        assert _magic(out, 2) == b"PK"
 
 
 # ── Full end-to-end scenario ──────────────────────────────────────────────────
@@ -385,7 +355,7 @@ class TestConvert:
 class TestFullScenario:
     """Simulates what a CLI user does after receiving their API key."""
 
-    def test_complete_workflow(self, client: FormaTexClient, tmp_path: Path):
+    def test_complete_workflow(self, client: FormaTexClient, out_dir: Path):
         """
         1. Check engines available
         2. Lint the document
@@ -404,9 +374,9 @@ class TestFullScenario:
         before = client.get_usage()
 
         # Step 4: compile
-        out = tmp_path / "final.pdf"
+        out = out_dir / "final.pdf"
         client.compile_to_file(SIMPLE_DOC, out)
-        assert out.read_bytes()[:4] == b"%PDF"
+        assert _magic(out, 4) == b"%PDF"
 
         # Step 5: check usage increased
         after = client.get_usage()
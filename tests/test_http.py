@@ -0,0 +1,511 @@
+"""Unit tests for the low-level HTTP transport.
+
+Requests are served by an in-process ``httpx.MockTransport`` — no real API
+calls are made.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import gzip
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from formatex import _http
+from formatex._http import (
+    DEFAULT_LIMITS,
+    HTTP2_AVAILABLE,
+    AsyncHTTPClient,
+    HTTPClient,
+    TokenBucket,
+)
+from formatex.exceptions import (
+    AuthenticationError,
+    CompilationError,
+    FormaTexError,
+    PlanLimitError,
+    RateLimitError,
+)
+
+FAKE_PDF = b"%PDF-1.4 fake-content"
+
+
+def _make_http(handler, **kwargs) -> HTTPClient:
+    """HTTPClient whose requests are answered by ``handler(request)``."""
+    http = HTTPClient(api_key="fx_test_key_abc", base_url="https://api.test", timeout=5.0, **kwargs)
+    http._client = httpx.Client(
+        base_url="https://api.test",
+        headers={"X-API-Key": "fx_test_key_abc"},
+        transport=httpx.MockTransport(handler),
+    )
+    return http
+
+
+# ── connection setup ──────────────────────────────────────────────────────────
+
+
+class TestConnectionSetup:
+    def test_pool_limits_and_http2(self):
+        with patch("formatex._http.httpx.Client") as mock_client:
+            HTTPClient(api_key="fx_key", base_url="https://api.test/", timeout=5.0)
+        kwargs = mock_client.call_args.kwargs
+        assert kwargs["base_url"] == "https://api.test"
+        assert kwargs["limits"] is DEFAULT_LIMITS
+        assert kwargs["http2"] is HTTP2_AVAILABLE
+
+    def test_custom_limits_replace_default_pool(self):
+        limits = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300)
+        with patch("formatex._http.httpx.Client") as mock_client:
+            HTTPClient(api_key="fx_key", base_url="https://api.test", timeout=5.0, limits=limits)
+        assert mock_client.call_args.kwargs["limits"] is limits
+
+    def test_async_client_shares_pool_settings(self):
+        with patch("formatex._http.httpx.AsyncClient") as mock_client:
+            AsyncHTTPClient(api_key="fx_key", base_url="https://api.test", timeout=5.0)
+        kwargs = mock_client.call_args.kwargs
+        assert kwargs["limits"] is DEFAULT_LIMITS
+        assert kwargs["http2"] is HTTP2_AVAILABLE
+        assert kwargs["headers"] == {"X-API-Key": "fx_key"}
+
+
+# ── JSON encoding ─────────────────────────────────────────────────────────────
+
+
+class TestJsonCodec:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_post_json_round_trip(self, use_orjson):
+        seen = {}
+
+        def handler(request):
+            seen["content_type"] = request.headers["Content-Type"]
+            seen["body"] = request.content
+            return httpx.Response(200, json={"echo": "café"})
+
+        http = _make_http(handler)
+        orjson_mod = _http.orjson if use_orjson else None
+        if use_orjson and orjson_mod is None:
+            pytest.skip("orjson not installed")
+        with patch("formatex._http.orjson", orjson_mod):
+            data = http.post_json("/api/v1/lint", {"latex": "é"})
+
+        assert data == {"echo": "café"}
+        assert seen["content_type"] == "application/json"
+        assert seen["body"] == '{"latex":"é"}'.encode()
+
+    def test_compressed_json_response_is_decoded(self):
+        seen = {}
+
+        def handler(request):
+            seen["accept_encoding"] = request.headers["Accept-Encoding"]
+            return httpx.Response(
+                200,
+                content=gzip.compress(b'{"pdf":"JVBERg=="}'),
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            )
+
+        data = _make_http(handler).post_json("/api/v1/compile", {"latex": "x"})
+
+        assert "gzip" in seen["accept_encoding"]
+        assert data == {"pdf": "JVBERg=="}
+
+
+# ── multipart uploads ─────────────────────────────────────────────────────────
+
+
+class TestMultipart:
+    def test_raw_files_are_sent_as_multipart(self):
+        seen = {}
+
+        def handler(request):
+            seen["content_type"] = request.headers["Content-Type"]
+            seen["accept"] = request.headers["Accept"]
+            seen["body"] = request.read()
+            return httpx.Response(200, json={"ok": True})
+
+        body = {
+            "latex": "x",
+            "runs": 2,
+            "files": [
+                {"name": "fig.png", "bytes": b"\x89PNG raw"},
+                {"name": "refs.bib", "content": "QGFydGljbGV7fQ=="},
+            ],
+        }
+        assert _make_http(handler).post_json("/api/v1/compile", body) == {"ok": True}
+
+        assert seen["content_type"].startswith("multipart/form-data")
+        assert seen["accept"] == "application/json"
+        assert b'name="runs"\r\n\r\n2\r\n' in seen["body"]
+        assert b'filename="fig.png"' in seen["body"]
+        assert b"\x89PNG raw" in seen["body"]
+        assert b"@article{}" in seen["body"]
+
+    def test_base64_only_files_stay_json(self):
+        kwargs = HTTPClient._request_body({"latex": "x", "files": [{"name": "a", "content": "YQ=="}]})
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+
+# ── post_pdf ──────────────────────────────────────────────────────────────────
+
+
+class TestPostPdf:
+    def test_binary_response_reads_metadata_headers(self):
+        def handler(request):
+            assert request.headers["Accept"] == "application/pdf, application/json;q=0.1"
+            return httpx.Response(
+                200,
+                content=FAKE_PDF,
+                headers={
+                    "Content-Type": "application/pdf",
+                    "X-FormaTex-Engine": "lualatex",
+                    "X-FormaTex-Duration": "321",
+                    "X-FormaTex-JobId": "job-7",
+                },
+            )
+
+        pdf, meta = _make_http(handler).post_pdf("/api/v1/compile", {"latex": "x"})
+        assert pdf == FAKE_PDF
+        assert meta == {
+            "engine": "lualatex",
+            "duration": 321,
+            "jobId": "job-7",
+            "sizeBytes": len(FAKE_PDF),
+        }
+
+    def test_json_response_is_returned_as_fallback(self):
+        def handler(request):
+            return httpx.Response(200, json={"pdf": "JVBERg==", "engine": "pdflatex"})
+
+        pdf, meta = _make_http(handler).post_pdf("/api/v1/compile", {"latex": "x"})
+        assert pdf is None
+        assert meta["pdf"] == "JVBERg=="
+
+    def test_errors_are_mapped(self):
+        def handler(request):
+            return httpx.Response(422, json={"error": "bad", "log": "! oops"})
+
+        with pytest.raises(CompilationError) as exc_info:
+            _make_http(handler).post_pdf("/api/v1/compile", {"latex": "x"})
+        assert exc_info.value.log == "! oops"
+
+
+# ── post_stream_to ────────────────────────────────────────────────────────────
+
+
+class TestPostStreamTo:
+    def test_streams_binary_body_to_file(self, tmp_path):
+        def handler(request):
+            return httpx.Response(
+                200,
+                content=FAKE_PDF * 1000,
+                headers={"Content-Type": "application/pdf", "X-FormaTex-Engine": "pdflatex"},
+            )
+
+        dest = tmp_path / "out.pdf"
+        written, meta = _make_http(handler).post_stream_to("/api/v1/compile", {}, dest, chunk_size=1024)
+        assert written == len(FAKE_PDF) * 1000
+        assert dest.read_bytes() == FAKE_PDF * 1000
+        assert meta["engine"] == "pdflatex"
+        assert meta["sizeBytes"] == written
+
+    def test_json_response_writes_nothing(self, tmp_path):
+        dest = tmp_path / "out.pdf"
+        http = _make_http(lambda request: httpx.Response(200, json={"pdf": "JVBERg=="}))
+        written, meta = http.post_stream_to("/api/v1/compile", {}, dest)
+        assert written is None
+        assert meta == {"pdf": "JVBERg=="}
+        assert not dest.exists()
+
+    def test_error_leaves_existing_file_untouched(self, tmp_path):
+        dest = tmp_path / "out.pdf"
+        dest.write_bytes(b"previous")
+        http = _make_http(lambda request: httpx.Response(422, json={"error": "bad", "log": "! x"}))
+        with pytest.raises(CompilationError):
+            http.post_stream_to("/api/v1/compile", {}, dest)
+        assert dest.read_bytes() == b"previous"
+
+    def test_dropped_connection_leaves_existing_file_untouched(self, tmp_path):
+        def body():
+            yield FAKE_PDF
+            raise httpx.ReadError("connection reset")
+
+        dest = tmp_path / "out.pdf"
+        dest.write_bytes(b"previous")
+        http = _make_http(
+            lambda request: httpx.Response(200, content=body(), headers={"Content-Type": "application/pdf"})
+        )
+        with pytest.raises(httpx.ReadError):
+            http.post_stream_to("/api/v1/compile", {}, dest)
+        assert dest.read_bytes() == b"previous"
+        assert [p.name for p in tmp_path.iterdir()] == ["out.pdf"]
+
+    def test_async_streams_binary_body_to_file(self, tmp_path):
+        def handler(request):
+            return httpx.Response(200, content=FAKE_PDF * 1000, headers={"Content-Type": "application/pdf"})
+
+        dest = tmp_path / "out.pdf"
+        http = AsyncHTTPClient(api_key="fx_key", base_url="https://api.test", timeout=5.0)
+        http._client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+        written, _ = asyncio.run(http.post_stream_to("/api/v1/compile", {}, dest, chunk_size=1024))
+        assert written == len(FAKE_PDF) * 1000
+        assert dest.read_bytes() == FAKE_PDF * 1000
+
+    def test_async_dropped_connection_leaves_existing_file_untouched(self, tmp_path):
+        async def body():
+            yield FAKE_PDF
+            raise httpx.ReadError("connection reset")
+
+        def handler(request):
+            return httpx.Response(200, content=body(), headers={"Content-Type": "application/pdf"})
+
+        dest = tmp_path / "out.pdf"
+        dest.write_bytes(b"previous")
+        http = AsyncHTTPClient(api_key="fx_key", base_url="https://api.test", timeout=5.0)
+        http._client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+        with pytest.raises(httpx.ReadError):
+            asyncio.run(http.post_stream_to("/api/v1/compile", {}, dest))
+        assert dest.read_bytes() == b"previous"
+        assert [p.name for p in tmp_path.iterdir()] == ["out.pdf"]
+
+
+# ── error mapping ─────────────────────────────────────────────────────────────
+
+
+class TestErrorMapping:
+    @pytest.mark.parametrize(
+        "status,exc_type",
+        [
+            (401, AuthenticationError),
+            (403, PlanLimitError),
+            (422, CompilationError),
+            (429, RateLimitError),
+            (500, FormaTexError),
+        ],
+    )
+    def test_status_maps_to_exception(self, status, exc_type):
+        http = _make_http(lambda request: httpx.Response(status, json={"error": "nope"}))
+        with pytest.raises(exc_type, match="nope") as exc_info:
+            http.get_json("/api/v1/usage")
+        assert exc_info.value.status_code == status
+
+    def test_retry_after_header_parsed(self):
+        http = _make_http(
+            lambda request: httpx.Response(429, json={"error": "slow"}, headers={"Retry-After": "12"})
+        )
+        with pytest.raises(RateLimitError) as exc_info:
+            http.get_json("/api/v1/usage")
+        assert exc_info.value.retry_after == 12.0
+
+    def test_retry_after_http_date_parsed(self):
+        when = email.utils.format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        http = _make_http(
+            lambda request: httpx.Response(429, json={"error": "slow"}, headers={"Retry-After": when})
+        )
+        with pytest.raises(RateLimitError) as exc_info:
+            http.get_json("/api/v1/usage")
+        assert 28.0 <= exc_info.value.retry_after <= 30.0
+
+    def test_json_is_only_parsed_when_declared(self):
+        http = _make_http(
+            lambda request: httpx.Response(
+                500, content=b'{"error": "hidden"}', headers={"Content-Type": "text/plain"}
+            )
+        )
+        with pytest.raises(FormaTexError) as exc_info:
+            http.get_json("/api/v1/usage")
+        assert exc_info.value.body == {}
+        assert str(exc_info.value) == '{"error": "hidden"}'
+
+    def test_malformed_json_error_body(self):
+        http = _make_http(
+            lambda request: httpx.Response(
+                500, content=b"{not json", headers={"Content-Type": "application/json"}
+            )
+        )
+        with pytest.raises(FormaTexError, match="not json"):
+            http.get_json("/api/v1/usage")
+
+    def test_non_json_error_body_uses_text(self):
+        http = _make_http(lambda request: httpx.Response(502, text="Bad Gateway"))
+        with pytest.raises(FormaTexError, match="Bad Gateway"):
+            http.get_json("/api/v1/usage")
+
+
+# ── long-poll GET ─────────────────────────────────────────────────────────────
+
+
+class TestLongPoll:
+    def test_wait_param_and_extended_read_timeout(self):
+        seen = {}
+
+        def handler(request):
+            seen["wait"] = request.url.params.get("wait")
+            seen["timeout"] = request.extensions["timeout"]
+            return httpx.Response(200, json={"status": "processing"})
+
+        http = _make_http(handler)
+        http._client.timeout = httpx.Timeout(5.0)
+        assert http.get_json("/api/v1/jobs/j1", wait=30) == {"status": "processing"}
+        assert seen["wait"] == "30"
+        assert seen["timeout"]["read"] == 35.0
+        assert seen["timeout"]["connect"] == 5.0
+
+
+# ── conditional GET ───────────────────────────────────────────────────────────
+
+
+class TestConditionalGet:
+    def _etag_server(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"engines": ["pdflatex"]}, headers={"ETag": '"v1"'})
+
+        return handler, seen
+
+    def test_not_modified_reuses_stored_body(self):
+        handler, seen = self._etag_server()
+        http = _make_http(handler)
+        first = http.get_json("/api/v1/engines", conditional=True)
+        second = http.get_json("/api/v1/engines", conditional=True)
+        assert first == second == {"engines": ["pdflatex"]}
+        assert seen == [None, '"v1"']
+
+    def test_plain_get_sends_no_validator(self):
+        handler, seen = self._etag_server()
+        http = _make_http(handler)
+        http.get_json("/api/v1/engines")
+        http.get_json("/api/v1/engines")
+        assert seen == [None, None]
+        assert http._etags == {}
+
+    def test_async_not_modified_reuses_stored_body(self):
+        handler, seen = self._etag_server()
+        http = AsyncHTTPClient(api_key="fx_test_key_abc", base_url="https://api.test", timeout=5.0)
+        http._client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+
+        async def fetch_twice():
+            return [await http.get_json("/api/v1/engines", conditional=True) for _ in range(2)]
+
+        assert asyncio.run(fetch_twice()) == [{"engines": ["pdflatex"]}] * 2
+        assert seen == [None, '"v1"']
+
+
+# ── retries and throttling ────────────────────────────────────────────────────
+
+
+class TestRateLimitRetry:
+    def _flaky(self, failures, retry_after="1"):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) <= failures:
+                return httpx.Response(429, json={"error": "slow down"}, headers={"Retry-After": retry_after})
+            return httpx.Response(200, json={"ok": True})
+
+        return handler, calls
+
+    def test_retries_after_server_delay(self):
+        handler, calls = self._flaky(failures=2)
+        http = _make_http(handler, max_retries=3)
+        with patch("formatex._http.time.sleep") as mock_sleep:
+            assert http.get_json("/api/v1/usage") == {"ok": True}
+        assert len(calls) == 3
+        assert mock_sleep.call_count == 2
+        for (delay,), _ in mock_sleep.call_args_list:
+            assert 1.0 <= delay <= 1.1
+
+    def test_retry_resends_body_serialized_once(self):
+        handler, calls = self._flaky(failures=1)
+        http = _make_http(handler, max_retries=3)
+        with patch("formatex._http.time.sleep"), \
+                patch("formatex._http.dumps", wraps=_http.dumps) as mock_dumps:
+            http.post_json("/api/v1/compile", {"latex": "x"})
+        assert mock_dumps.call_count == 1
+        assert calls[0].content == calls[1].content == b'{"latex":"x"}'
+
+    def test_pre_serialized_body_is_sent_as_is(self):
+        handler, calls = self._flaky(failures=0)
+        _make_http(handler).post_json("/api/v1/compile", b'{"latex": "x"}')
+        assert calls[0].content == b'{"latex": "x"}'
+        assert calls[0].headers["Content-Type"] == "application/json"
+
+    def test_raises_when_retries_exhausted(self):
+        handler, calls = self._flaky(failures=5)
+        http = _make_http(handler, max_retries=2)
+        with patch("formatex._http.time.sleep"):
+            with pytest.raises(RateLimitError):
+                http.get_json("/api/v1/usage")
+        assert len(calls) == 3
+
+    def test_no_retry_by_default(self):
+        handler, calls = self._flaky(failures=1)
+        with pytest.raises(RateLimitError):
+            _make_http(handler).get_json("/api/v1/usage")
+        assert len(calls) == 1
+
+    def test_long_retry_after_is_not_slept_through(self):
+        handler, calls = self._flaky(failures=1, retry_after="3600")
+        http = _make_http(handler, max_retries=3)
+        with patch("formatex._http.time.sleep") as mock_sleep:
+            with pytest.raises(RateLimitError):
+                http.get_json("/api/v1/usage")
+        mock_sleep.assert_not_called()
+
+    def test_missing_retry_after_backs_off_exponentially(self):
+        handler, _ = self._flaky(failures=2, retry_after="0")
+        http = _make_http(handler, max_retries=3)
+        with patch("formatex._http.time.sleep") as mock_sleep, \
+                patch("formatex._http.random.uniform", return_value=0.0):
+            http.get_json("/api/v1/usage")
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 2.0]
+
+    @pytest.mark.parametrize("retry_after", ["Wed, 21 Oct 2015 07:28:00 GMT", "soon"])
+    def test_past_or_garbled_retry_after_falls_back_to_backoff(self, retry_after):
+        handler, calls = self._flaky(failures=1, retry_after=retry_after)
+        http = _make_http(handler, max_retries=3)
+        with patch("formatex._http.time.sleep") as mock_sleep, \
+                patch("formatex._http.random.uniform", return_value=0.0):
+            assert http.get_json("/api/v1/usage") == {"ok": True}
+        assert len(calls) == 2
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_async_transport_retries(self):
+        handler, calls = self._flaky(failures=1)
+        http = AsyncHTTPClient(api_key="fx_key", base_url="https://api.test", timeout=5.0, max_retries=1)
+        http._client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+        with patch("formatex._http.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            assert asyncio.run(http.get_json("/api/v1/usage")) == {"ok": True}
+        assert len(calls) == 2
+        mock_sleep.assert_awaited_once()
+
+
+class TestTokenBucket:
+    def test_burst_then_paced(self):
+        with patch("formatex._http.time.monotonic", return_value=0.0):
+            bucket = TokenBucket(rate=2.0, burst=2)
+            assert bucket.reserve() == 0.0
+            assert bucket.reserve() == 0.0
+            assert bucket.reserve() == pytest.approx(0.5)
+            assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_refills_over_time(self):
+        with patch("formatex._http.time.monotonic", return_value=0.0):
+            bucket = TokenBucket(rate=1.0)
+            bucket.reserve()
+        with patch("formatex._http.time.monotonic", return_value=1.0):
+            assert bucket.reserve() == 0.0
+
+    def test_requests_wait_for_tokens(self):
+        http = _make_http(lambda request: httpx.Response(200, json={}), rate_limit=1.0)
+        http._bucket.reserve = lambda: 0.25
+        with patch("formatex._http.time.sleep") as mock_sleep:
+            http.get_json("/api/v1/engines")
+        mock_sleep.assert_called_once_with(0.25)